@@ -0,0 +1,117 @@
+import math
+import threading
+import time
+from functools import wraps
+from flask import jsonify
+
+# Weight of the newest sample in the moving average of service time
+EWMA_ALPHA = 0.2
+
+
+class Rejected(Exception):
+    def __init__(self, status, message, retry_after):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = max(1, int(math.ceil(retry_after)))
+
+
+class AdmissionController:
+    """Concurrency limit with a bounded, deadline-aware wait queue for one endpoint.
+
+    Up to max_concurrent requests run at once and up to max_queue wait. A
+    request that would be queued is rejected immediately with 429 when the
+    estimated wait (queue position x average service time / concurrency)
+    already exceeds budget_seconds, and with 503 when the queue is full or
+    the budget runs out while waiting.
+    """
+
+    def __init__(self, name, max_concurrent, max_queue, budget_seconds, initial_service_time=0.5):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.budget_seconds = budget_seconds
+        self.avg_service_time = initial_service_time
+        self.active = 0
+        self.waiting = 0
+        self.peak_waiting = 0
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_deadline = 0
+        self.timed_out = 0
+        self._cond = threading.Condition()
+
+    def _estimated_wait(self, position):
+        return position / self.max_concurrent * self.avg_service_time
+
+    def acquire(self):
+        with self._cond:
+            if self.active < self.max_concurrent and self.waiting == 0:
+                self.active += 1
+                self.admitted += 1
+                return
+
+            if self.waiting >= self.max_queue:
+                self.rejected_queue_full += 1
+                raise Rejected(503, f'{self.name} is overloaded, please retry later',
+                               self._estimated_wait(self.waiting + 1))
+
+            estimate = self._estimated_wait(self.waiting + 1)
+            if estimate > self.budget_seconds:
+                self.rejected_deadline += 1
+                raise Rejected(429, f'{self.name} is busy, please retry later', estimate)
+
+            deadline = time.monotonic() + self.budget_seconds
+            self.waiting += 1
+            self.peak_waiting = max(self.peak_waiting, self.waiting)
+            try:
+                while self.active >= self.max_concurrent:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.timed_out += 1
+                        raise Rejected(503, f'{self.name} is overloaded, please retry later',
+                                       self._estimated_wait(self.waiting))
+                    self._cond.wait(remaining)
+                self.active += 1
+                self.admitted += 1
+            finally:
+                self.waiting -= 1
+
+    def release(self, service_time):
+        with self._cond:
+            self.active -= 1
+            self.avg_service_time += EWMA_ALPHA * (service_time - self.avg_service_time)
+            self._cond.notify()
+
+    def stats(self):
+        with self._cond:
+            return {
+                'active': self.active,
+                'waiting': self.waiting,
+                'peak_waiting': self.peak_waiting,
+                'max_concurrent': self.max_concurrent,
+                'max_queue': self.max_queue,
+                'budget_seconds': self.budget_seconds,
+                'avg_service_time': round(self.avg_service_time, 4),
+                'admitted': self.admitted,
+                'rejected_queue_full': self.rejected_queue_full,
+                'rejected_deadline': self.rejected_deadline,
+                'timed_out': self.timed_out
+            }
+
+
+def admission_controlled(controller):
+    """Run a Flask view under the controller; rejected requests get 429/503 with Retry-After"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                controller.acquire()
+            except Rejected as e:
+                return jsonify({'error': str(e)}), e.status, {'Retry-After': str(e.retry_after)}
+            started = time.monotonic()
+            try:
+                return view(*args, **kwargs)
+            finally:
+                controller.release(time.monotonic() - started)
+        return wrapper
+    return decorator
@@ -2,18 +2,32 @@ from flask import Flask, request, jsonify, send_from_directory, session, send_fi
 from flask_cors import CORS
 import os
 from werkzeug.utils import secure_filename
+from werkzeug.exceptions import HTTPException
 from werkzeug.security import generate_password_hash, check_password_hash
 import re
 import PyPDF2
-from docx import Document as DocxDocument
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_community.vectorstores import Chroma
-from langchain.schema import Document
 import json
+import uuid
 from datetime import datetime
 import sqlite3
 import pandas as pd
+from resume_scoring import ResumeScorer, DEFAULT_WEIGHTS
+from saved_searches import SavedSearchIndex, DEFAULT_THRESHOLD
+from vector_store import create_vector_store, ShardedVectorStore, Compactor, cosine_similarity
+from embedding_snapshot import SnapshotSearcher, SnapshotWriter
+from admission import AdmissionController, admission_controlled
+from request_profiling import RequestProfiler
+import corpus_analytics
+import skill_index
+from parse_cache import ParseCache, content_hash
+from docx_text import extract_docx_text
+from text_store import TextStore, DictionaryTrainer
+from contact_fields import extract_contacts
+from static_assets import StaticAssets
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+from file_sources import open_source, read_bytes, detect_file_type, persist_bytes
 
 app = Flask(__name__)
 app.secret_key = 'your-secret-key-change-this-in-production'
@@ -21,11 +35,72 @@ CORS(app, supports_credentials=True)
 
 # Configuration
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-UPLOAD_FOLDER = os.path.join(BASE_DIR, 'uploads')
-DB_PATH = os.path.join(BASE_DIR, 'database.db')
-VECTORDB_PATH = os.path.join(BASE_DIR, 'vectordb')
-EXCEL_EXPORT_PATH = os.path.join(BASE_DIR, 'excel_exports')
+# Database, uploads, vectors and exports live here; overridden by the load-test harness
+DATA_DIR = os.environ.get('RESUMERAG_DATA_DIR', BASE_DIR)
+UPLOAD_FOLDER = os.path.join(DATA_DIR, 'uploads')
+FRONTEND_DIR = os.environ.get('RESUMERAG_FRONTEND_DIR', os.path.join(BASE_DIR, 'FRONTEND'))
+# Held in memory, fingerprinted and precompressed at startup; other frontend files are read per request
+STATIC_ASSETS = ['index.html', 'script.js', 'style.css']
+DB_PATH = os.path.join(DATA_DIR, 'database.db')
+VECTORDB_PATH = os.path.join(DATA_DIR, 'vectordb')
+EXCEL_EXPORT_PATH = os.path.join(DATA_DIR, 'excel_exports')
+SNAPSHOT_PATH = os.path.join(VECTORDB_PATH, 'snapshots')
+PROFILE_PATH = os.path.join(DATA_DIR, 'profiles')
+PARSE_CACHE_PATH = os.path.join(DATA_DIR, 'parse_cache')
+# Extracted text and parsed fields are cached per file content under these versions;
+# bump one whenever extract_text or extract_resume_data changes its output
+TEXT_EXTRACTOR_VERSION = '2'
+RESUME_DATA_VERSION = '2'
+# Requests sent with 'X-Profile: <token>' are profiled; the same token unlocks /api/admin/profiles
+PROFILE_TOKEN = os.environ.get('RESUMERAG_PROFILE_TOKEN', '')
+PROFILE_SAMPLE_RATE = float(os.environ.get('RESUMERAG_PROFILE_SAMPLE_RATE', 0))
 ALLOWED_EXTENSIONS = {'pdf', 'docx', 'txt', 'doc'}
+# Vector backend: 'chroma' (default) or 'hnsw' (local hnswlib index with memory-mapped vectors)
+VECTOR_BACKEND = os.environ.get('RESUMERAG_VECTOR_BACKEND', 'chroma')
+HNSW_M = int(os.environ.get('RESUMERAG_HNSW_M', 16))
+HNSW_EF_CONSTRUCTION = int(os.environ.get('RESUMERAG_HNSW_EF_CONSTRUCTION', 200))
+HNSW_EF_SEARCH = int(os.environ.get('RESUMERAG_HNSW_EF_SEARCH', 64))
+# Shard the resume collection by a metadata field ('college', 'uploaded_by', ...); empty disables
+# sharding. 'value' mode keeps one shard per value, 'hash' spreads values over SHARD_COUNT shards
+SHARD_KEY = os.environ.get('RESUMERAG_SHARD_KEY', '')
+SHARD_MODE = os.environ.get('RESUMERAG_SHARD_MODE', 'value')
+SHARD_COUNT = int(os.environ.get('RESUMERAG_SHARD_COUNT', 16))
+SHARD_SEARCH_WORKERS = int(os.environ.get('RESUMERAG_SHARD_SEARCH_WORKERS', 8))
+# Metadata fields clients may filter searches on
+SEARCH_FILTER_FIELDS = {'college', 'degree', 'uploaded_by'}
+# Serve searches from a shared memory-mapped snapshot of each collection plus a small delta
+# of newer writes, so several worker processes share one copy of the vectors. Not supported
+# together with RESUMERAG_SHARD_KEY: a snapshot covers one store, not a set of shards
+SNAPSHOT_READS = os.environ.get('RESUMERAG_SNAPSHOT_READS', '0') == '1'
+SNAPSHOT_INTERVAL = float(os.environ.get('RESUMERAG_SNAPSHOT_INTERVAL', 300))
+# Admission control for the embedding-heavy endpoints: (max concurrent, max queued, wait budget in seconds)
+UPLOAD_LIMITS = (int(os.environ.get('RESUMERAG_UPLOAD_CONCURRENCY', 2)),
+                 int(os.environ.get('RESUMERAG_UPLOAD_QUEUE', 8)),
+                 float(os.environ.get('RESUMERAG_UPLOAD_BUDGET', 10)))
+SEARCH_LIMITS = (int(os.environ.get('RESUMERAG_SEARCH_CONCURRENCY', 4)),
+                 int(os.environ.get('RESUMERAG_SEARCH_QUEUE', 16)),
+                 float(os.environ.get('RESUMERAG_SEARCH_BUDGET', 2)))
+MATCH_LIMITS = (int(os.environ.get('RESUMERAG_MATCH_CONCURRENCY', 4)),
+                int(os.environ.get('RESUMERAG_MATCH_QUEUE', 16)),
+                float(os.environ.get('RESUMERAG_MATCH_BUDGET', 2)))
+BATCH_SEARCH_LIMITS = (int(os.environ.get('RESUMERAG_BATCH_SEARCH_CONCURRENCY', 2)),
+                       int(os.environ.get('RESUMERAG_BATCH_SEARCH_QUEUE', 4)),
+                       float(os.environ.get('RESUMERAG_BATCH_SEARCH_BUDGET', 10)))
+# Batched search: most queries per request and threads running their vector lookups
+BATCH_SEARCH_MAX_QUERIES = int(os.environ.get('RESUMERAG_BATCH_SEARCH_MAX_QUERIES', 50))
+BATCH_SEARCH_WORKERS = int(os.environ.get('RESUMERAG_BATCH_SEARCH_WORKERS', 8))
+# Deleted vectors are tombstoned; a collection is rebuilt once its tombstones reach this share
+# of live documents (and at least the minimum count), checked every interval seconds
+COMPACTION_RATIO = float(os.environ.get('RESUMERAG_COMPACTION_RATIO', 0.2))
+COMPACTION_MIN_TOMBSTONES = int(os.environ.get('RESUMERAG_COMPACTION_MIN_TOMBSTONES', 100))
+COMPACTION_INTERVAL = float(os.environ.get('RESUMERAG_COMPACTION_INTERVAL', 60))
+# How often the background job checks whether the full-text dictionary can be trained
+TEXT_DICTIONARY_INTERVAL = float(os.environ.get('RESUMERAG_TEXT_DICTIONARY_INTERVAL', 60))
+# Vector search fetches this many candidates per requested result for re-ranking
+RERANK_CANDIDATE_FACTOR = 4
+RERANK_MIN_CANDIDATES = 50
+# Requested result counts (top_k) are clamped to 1..MAX_TOP_K
+MAX_TOP_K = int(os.environ.get('RESUMERAG_MAX_TOP_K', 100))
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024
 
@@ -35,6 +110,29 @@ os.makedirs(os.path.join(VECTORDB_PATH, 'resumes'), exist_ok=True)
 os.makedirs(os.path.join(VECTORDB_PATH, 'jobs'), exist_ok=True)
 os.makedirs(EXCEL_EXPORT_PATH, exist_ok=True)
 
+parse_cache = ParseCache(PARSE_CACHE_PATH)
+
+try:
+    static_assets = StaticAssets(FRONTEND_DIR, STATIC_ASSETS)
+except OSError as e:
+    print(f"Frontend assets not loaded: {e}")
+    static_assets = None
+
+profiler = RequestProfiler(PROFILE_PATH, PROFILE_TOKEN, PROFILE_SAMPLE_RATE)
+profiler.init_app(app)
+
+admission = {
+    'upload': AdmissionController('Resume upload', *UPLOAD_LIMITS),
+    'search': AdmissionController('Resume search', *SEARCH_LIMITS),
+    'match': AdmissionController('Job matching', *MATCH_LIMITS),
+    'batch_search': AdmissionController('Batch resume search', *BATCH_SEARCH_LIMITS)
+}
+
+# Uploads are written to disk in the background while they are being parsed
+upload_writer = ThreadPoolExecutor(max_workers=4, thread_name_prefix='upload-writer')
+# Vector lookups of a batched search run side by side here
+batch_search_pool = ThreadPoolExecutor(max_workers=BATCH_SEARCH_WORKERS, thread_name_prefix='batch-search')
+
 # Initialize Database
 def init_db():
     conn = sqlite3.connect(DB_PATH)
@@ -91,9 +189,100 @@ def init_db():
                   created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                   status TEXT DEFAULT 'pending')''')
     
+    c.execute('''CREATE TABLE IF NOT EXISTS saved_searches
+                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                  name TEXT NOT NULL,
+                  job_description TEXT NOT NULL,
+                  embedding BLOB NOT NULL,
+                  threshold REAL NOT NULL,
+                  created_by TEXT,
+                  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+    
+    c.execute('''CREATE TABLE IF NOT EXISTS saved_search_hits
+                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                  search_id INTEGER NOT NULL,
+                  resume_id INTEGER,
+                  filename TEXT,
+                  score REAL,
+                  seen INTEGER DEFAULT 0,
+                  matched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+    
+    c.execute('CREATE INDEX IF NOT EXISTS idx_saved_search_hits_search ON saved_search_hits (search_id, id)')
+    # One hit per search and resume; duplicates recorded before the index existed are dropped first
+    if not c.execute("SELECT 1 FROM sqlite_master WHERE name = 'idx_saved_search_hits_resume'").fetchone():
+        c.execute('''DELETE FROM saved_search_hits WHERE id NOT IN
+                     (SELECT MIN(id) FROM saved_search_hits GROUP BY search_id, resume_id)''')
+    c.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_saved_search_hits_resume ON saved_search_hits (search_id, resume_id)')
+    
+    # Aggregates maintained by corpus_analytics on every insert
+    c.execute('''CREATE TABLE IF NOT EXISTS analytics_counts
+                 (dimension TEXT NOT NULL,
+                  key TEXT NOT NULL,
+                  count INTEGER NOT NULL DEFAULT 0,
+                  PRIMARY KEY (dimension, key))''')
+    
+    c.execute('''CREATE TABLE IF NOT EXISTS analytics_education_skills
+                 (college TEXT NOT NULL,
+                  degree TEXT NOT NULL,
+                  skill TEXT NOT NULL,
+                  count INTEGER NOT NULL DEFAULT 0,
+                  PRIMARY KEY (college, degree, skill))''')
+    
+    c.execute('''CREATE TABLE IF NOT EXISTS analytics_job_locations
+                 (company TEXT NOT NULL,
+                  location TEXT NOT NULL,
+                  count INTEGER NOT NULL DEFAULT 0,
+                  PRIMARY KEY (company, location))''')
+    
+    c.execute('''CREATE TABLE IF NOT EXISTS analytics_meta
+                 (name TEXT PRIMARY KEY,
+                  value TEXT)''')
+    
+    c.execute('CREATE INDEX IF NOT EXISTS idx_analytics_counts_top ON analytics_counts (dimension, count DESC)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_analytics_education_top ON analytics_education_skills (college, degree, count DESC)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_analytics_education_degree ON analytics_education_skills (degree)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_analytics_education_count ON analytics_education_skills (count DESC)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_analytics_job_locations_count ON analytics_job_locations (count DESC)')
+    
+    # Inverted index of normalized (lower-cased) skills, filled on insert
+    c.execute('''CREATE TABLE IF NOT EXISTS resume_skills
+                 (skill TEXT NOT NULL,
+                  resume_id INTEGER NOT NULL,
+                  PRIMARY KEY (skill, resume_id)) WITHOUT ROWID''')
+    
+    c.execute('CREATE INDEX IF NOT EXISTS idx_resume_skills_resume ON resume_skills (resume_id)')
+
+    # Updates and deletes of resumes/jobs, so caches in every process can catch up
+    c.execute('''CREATE TABLE IF NOT EXISTS record_changes
+                 (seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                  table_name TEXT NOT NULL,
+                  row_id INTEGER NOT NULL,
+                  changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+
+    c.execute('CREATE INDEX IF NOT EXISTS idx_record_changes_table ON record_changes (table_name, seq)')
+
+    # Full extracted resume texts, compressed; resumes.raw_text keeps a short preview
+    c.execute('''CREATE TABLE IF NOT EXISTS resume_texts
+                 (resume_id INTEGER PRIMARY KEY,
+                  dictionary_id INTEGER,
+                  codec TEXT NOT NULL,
+                  size INTEGER NOT NULL,
+                  data BLOB NOT NULL)''')
+
+    c.execute('''CREATE TABLE IF NOT EXISTS text_dictionaries
+                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                  codec TEXT NOT NULL,
+                  data BLOB NOT NULL,
+                  samples INTEGER,
+                  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+    
     conn.commit()
+    corpus_analytics.ensure_built(conn, resume_text_store.load)
+    skill_index.backfill(conn)
     conn.close()
 
+resume_text_store = TextStore()
+
 init_db()
 
 def get_db():
@@ -101,6 +290,9 @@ def get_db():
     conn.row_factory = sqlite3.Row
     return conn
 
+# Trains the full-text dictionary once enough resumes are stored, outside any request
+DictionaryTrainer(resume_text_store, get_db, TEXT_DICTIONARY_INTERVAL).start()
+
 def save_user(name, email, password):
     conn = get_db()
     c = conn.cursor()
@@ -117,7 +309,7 @@ def get_user(email):
     conn.close()
     return dict(user) if user else None
 
-def save_resume(resume_data, filename, user_email, college="", degree=""):
+def save_resume(resume_data, filename, user_email, college="", degree="", text=None):
     conn = get_db()
     c = conn.cursor()
     c.execute('''INSERT INTO resumes 
@@ -127,9 +319,16 @@ def save_resume(resume_data, filename, user_email, college="", degree=""):
                resume_data.get('phone'), college, degree, json.dumps(resume_data.get('skills')),
                resume_data.get('experience'), resume_data.get('education'),
                resume_data.get('raw_text'), user_email))
+    resume_id = c.lastrowid
+    if text is None:
+        text = resume_data.get('raw_text')
+    resume_text_store.store(c, resume_id, text)
+    skill_index.index_resume(c, resume_id, resume_data.get('skills'))
+    corpus_analytics.record_resume(c, resume_data.get('skills'), college, degree, text)
     conn.commit()
     conn.close()
     export_to_excel()
+    return resume_id
 
 def save_job(job_data, user_email):
     conn = get_db()
@@ -138,10 +337,171 @@ def save_job(job_data, user_email):
                  VALUES (?, ?, ?, ?, ?, ?)''',
               (job_data['title'], job_data['company'], job_data['location'],
                job_data['description'], job_data['requirements'], user_email))
+    job_id = c.lastrowid
+    corpus_analytics.record_job(c, job_data['company'], job_data['location'])
+    conn.commit()
+    conn.close()
+    export_to_excel()
+    return job_id
+
+def log_change(c, table, row_id):
+    c.execute('INSERT INTO record_changes (table_name, row_id) VALUES (?, ?)', (table, row_id))
+
+def get_resume_sections(resume_ids):
+    """Parsed experience and education of the given resumes, by id"""
+    resume_ids = [resume_id for resume_id in resume_ids if resume_id is not None]
+    if not resume_ids:
+        return {}
+    conn = get_db()
+    c = conn.cursor()
+    c.execute(f"SELECT id, experience, education FROM resumes WHERE id IN ({','.join('?' * len(resume_ids))})",
+              resume_ids)
+    sections = {row['id']: {'experience': row['experience'], 'education': row['education']} for row in c.fetchall()}
+    conn.close()
+    return sections
+
+def get_resume_text(resume_id, conn=None):
+    """Full extracted text of a resume, decompressed on demand; the preview for rows stored before full texts"""
+    own = conn is None
+    conn = conn or get_db()
+    try:
+        text = resume_text_store.load(conn, resume_id)
+        if text is None:
+            row = conn.execute('SELECT raw_text FROM resumes WHERE id = ?', (resume_id,)).fetchone()
+            text = row[0] if row else None
+        return text
+    finally:
+        if own:
+            conn.close()
+
+def _forget_resume_row(c, resume):
+    skills = json.loads(resume['skills']) if resume.get('skills') else []
+    day = c.execute('SELECT date(?)', (resume['uploaded_at'],)).fetchone()[0]
+    text = resume_text_store.load(c, resume['id'])
+    corpus_analytics.forget_resume(c, skills, resume['college'], resume['degree'],
+                                   resume['raw_text'] if text is None else text, day)
+    skill_index.remove_resume(c, resume['id'])
+
+def update_resume(resume, resume_data, filename, college, degree, text=None, export=True):
+    """Replace a resume's parsed fields in place, keeping its id and upload date"""
+    conn = get_db()
+    c = conn.cursor()
+    _forget_resume_row(c, resume)
+    if text is None:
+        text = resume_data.get('raw_text')
+    c.execute('''UPDATE resumes SET filename = ?, name = ?, email = ?, phone = ?, college = ?, degree = ?,
+                 skills = ?, experience = ?, education = ?, raw_text = ? WHERE id = ?''',
+              (filename, resume_data.get('name'), resume_data.get('email'), resume_data.get('phone'),
+               college, degree, json.dumps(resume_data.get('skills')), resume_data.get('experience'),
+               resume_data.get('education'), resume_data.get('raw_text'), resume['id']))
+    resume_text_store.store(c, resume['id'], text)
+    skill_index.index_resume(c, resume['id'], resume_data.get('skills'))
+    day = c.execute('SELECT date(?)', (resume['uploaded_at'],)).fetchone()[0]
+    corpus_analytics.record_resume(c, resume_data.get('skills'), college, degree, text, day)
+    log_change(c, 'resumes', resume['id'])
+    conn.commit()
+    conn.close()
+    if export:
+        export_to_excel()
+
+def delete_resume(resume):
+    conn = get_db()
+    c = conn.cursor()
+    _forget_resume_row(c, resume)
+    resume_text_store.delete(c, resume['id'])
+    c.execute('DELETE FROM resumes WHERE id = ?', (resume['id'],))
+    c.execute('DELETE FROM saved_search_hits WHERE resume_id = ?', (resume['id'],))
+    log_change(c, 'resumes', resume['id'])
+    conn.commit()
+    conn.close()
+    export_to_excel()
+
+def update_job(job, job_data):
+    conn = get_db()
+    c = conn.cursor()
+    corpus_analytics.forget_job(c, job['company'], job['location'])
+    c.execute('''UPDATE jobs SET title = ?, company = ?, location = ?, description = ?, requirements = ?
+                 WHERE id = ?''',
+              (job_data['title'], job_data['company'], job_data['location'],
+               job_data['description'], job_data['requirements'], job['id']))
+    corpus_analytics.record_job(c, job_data['company'], job_data['location'])
+    log_change(c, 'jobs', job['id'])
+    conn.commit()
+    conn.close()
+    export_to_excel()
+
+def delete_job(job):
+    conn = get_db()
+    c = conn.cursor()
+    corpus_analytics.forget_job(c, job['company'], job['location'])
+    c.execute('DELETE FROM jobs WHERE id = ?', (job['id'],))
+    log_change(c, 'jobs', job['id'])
     conn.commit()
     conn.close()
     export_to_excel()
 
+def get_resume(resume_id):
+    conn = get_db()
+    c = conn.cursor()
+    c.execute('SELECT * FROM resumes WHERE id = ?', (resume_id,))
+    resume = c.fetchone()
+    conn.close()
+    return dict(resume) if resume else None
+
+def get_job(job_id):
+    conn = get_db()
+    c = conn.cursor()
+    c.execute('SELECT * FROM jobs WHERE id = ?', (job_id,))
+    job = c.fetchone()
+    conn.close()
+    return dict(job) if job else None
+
+def get_ids_since(table, last_id):
+    """Row ids of resumes/jobs inserted after last_id"""
+    conn = get_db()
+    c = conn.cursor()
+    c.execute(f'SELECT id FROM {table} WHERE id > ? ORDER BY id', (last_id,))
+    ids = [row[0] for row in c.fetchall()]
+    conn.close()
+    return ids
+
+def get_changed_since(table, last_seq):
+    """Row ids of resumes/jobs updated or deleted after change log entry last_seq"""
+    conn = get_db()
+    c = conn.cursor()
+    c.execute('SELECT DISTINCT row_id FROM record_changes WHERE table_name = ? AND seq > ?', (table, last_seq))
+    ids = [row[0] for row in c.fetchall()]
+    conn.close()
+    return ids
+
+def last_change_seq(table):
+    conn = get_db()
+    c = conn.cursor()
+    c.execute('SELECT COALESCE(MAX(seq), 0) FROM record_changes WHERE table_name = ?', (table,))
+    seq = c.fetchone()[0]
+    conn.close()
+    return seq
+
+def snapshot_watermark(table, records, id_prefix):
+    """Highest row id W such that every resumes/jobs row up to W is among the vector records.
+
+    Rows inserted but not embedded yet when the records were read (an upload
+    still in flight) stop the watermark below them, so readers keep serving
+    them from the live store once they are.
+    """
+    indexed = {int(r['id'][len(id_prefix):]) for r in records
+               if r['id'].startswith(id_prefix) and r['id'][len(id_prefix):].isdigit()}
+    conn = get_db()
+    c = conn.cursor()
+    c.execute(f'SELECT id FROM {table} ORDER BY id')
+    watermark = 0
+    for (row_id,) in c:
+        if row_id not in indexed:
+            break
+        watermark = row_id
+    conn.close()
+    return watermark
+
 def get_all_resumes():
     conn = get_db()
     c = conn.cursor()
@@ -223,24 +583,61 @@ def export_to_excel():
         print(f"Error exporting to Excel: {str(e)}")
 
 class ResumeRAG:
-    def __init__(self):
+    def __init__(self, saved_searches=None):
         self.embeddings = HuggingFaceEmbeddings(
             model_name="sentence-transformers/all-MiniLM-L6-v2"
         )
         
-        self.resume_db = Chroma(
-            collection_name="resumes",
-            embedding_function=self.embeddings,
-            persist_directory=os.path.join(VECTORDB_PATH, 'resumes')
-        )
+        self.resume_db = self._open_sharded_store('resumes') if SHARD_KEY else self._open_store('resumes')
+        self.job_db = self._open_store('jobs')
         
-        self.job_db = Chroma(
-            collection_name="jobs",
-            embedding_function=self.embeddings,
-            persist_directory=os.path.join(VECTORDB_PATH, 'jobs')
+        # Read path: the store itself, or a shared snapshot of it when enabled
+        self.resume_search = self._open_reader(self.resume_db, 'resumes', 'resume-')
+        self.job_search = self._open_reader(self.job_db, 'jobs', 'job-')
+        
+        self.scorer = ResumeScorer()
+        self.saved_searches = saved_searches
+
+        self.compactor = Compactor([self.resume_db, self.job_db], COMPACTION_RATIO,
+                                   COMPACTION_MIN_TOMBSTONES, COMPACTION_INTERVAL).start()
+    
+    def _open_store(self, name):
+        return create_vector_store(
+            VECTOR_BACKEND, name, os.path.join(VECTORDB_PATH, name), self.embeddings,
+            M=HNSW_M, ef_construction=HNSW_EF_CONSTRUCTION, ef_search=HNSW_EF_SEARCH
         )
     
-    def add_resume(self, resume_data, filename, user_email):
+    def _open_sharded_store(self, name):
+        """Shards live under <collection>/shards/<shard>; the unsharded collection is kept as a legacy shard"""
+        shards_dir = os.path.join(VECTORDB_PATH, name, 'shards')
+        return ShardedVectorStore(
+            lambda shard: create_vector_store(
+                VECTOR_BACKEND, name, os.path.join(shards_dir, shard), self.embeddings,
+                M=HNSW_M, ef_construction=HNSW_EF_CONSTRUCTION, ef_search=HNSW_EF_SEARCH
+            ),
+            shards_dir, SHARD_KEY, SHARD_MODE, SHARD_COUNT,
+            legacy=self._open_store(name),
+            max_workers=SHARD_SEARCH_WORKERS
+        )
+    
+    def _open_reader(self, store, table, id_prefix):
+        if not SNAPSHOT_READS:
+            return store
+        if isinstance(store, ShardedVectorStore):
+            # A whole-collection snapshot would bypass shard routing by the filter
+            raise ValueError("RESUMERAG_SNAPSHOT_READS cannot be combined with RESUMERAG_SHARD_KEY")
+        
+        path = os.path.join(SNAPSHOT_PATH, f'{table}.snap')
+        SnapshotWriter(store, path, lambda records: snapshot_watermark(table, records, id_prefix),
+                       SNAPSHOT_INTERVAL, lambda: last_change_seq(table)).start()
+
+        def pending_ids(watermark, change_seq):
+            row_ids = dict.fromkeys(get_ids_since(table, watermark) + get_changed_since(table, change_seq))
+            return [f'{id_prefix}{row_id}' for row_id in row_ids]
+
+        return SnapshotSearcher(store, path, pending_ids)
+    
+    def add_resume(self, resume_data, filename, user_email, resume_id=None, evaluate_searches=True):
         text = f"""
         Name: {resume_data.get('name', '')}
         Email: {resume_data.get('email', '')}
@@ -251,24 +648,36 @@ class ResumeRAG:
         Raw Text: {resume_data.get('raw_text', '')}
         """
         
-        doc = Document(
-            page_content=text,
-            metadata={
-                'filename': filename,
-                'name': resume_data.get('name', ''),
-                'email': resume_data.get('email', ''),
-                'phone': resume_data.get('phone', ''),
-                'skills': json.dumps(resume_data.get('skills', [])),
-                'uploaded_by': user_email,
-                'uploaded_at': datetime.now().isoformat(),
-                'type': 'resume'
-            }
-        )
+        metadata = {
+            'filename': filename,
+            'name': resume_data.get('name', ''),
+            'email': resume_data.get('email', ''),
+            'phone': resume_data.get('phone', ''),
+            'skills': json.dumps(resume_data.get('skills', [])),
+            'college': resume_data.get('college', ''),
+            'degree': resume_data.get('degree', ''),
+            'uploaded_by': user_email,
+            'uploaded_at': datetime.now().isoformat(),
+            'type': 'resume'
+        }
+        
+        doc_id = str(uuid.uuid4())
+        if resume_id is not None:
+            metadata['resume_id'] = resume_id
+            doc_id = f'resume-{resume_id}'
         
-        self.resume_db.add_documents([doc])
+        # Embed once here so the same vector can be scored against saved searches
+        embedding = self.embeddings.embed_documents([text])[0]
+        self.resume_db.add([doc_id], [embedding], [text], [metadata])
         self.resume_db.persist()
+        
+        # Re-indexing an existing resume is not a new match for anyone
+        if self.saved_searches is not None and resume_id is not None and evaluate_searches:
+            self.saved_searches.evaluate(resume_id, filename, embedding)
+        
+        return embedding
     
-    def add_job(self, job_data, user_email):
+    def add_job(self, job_data, user_email, job_id=None):
         text = f"""
         Title: {job_data.get('title', '')}
         Company: {job_data.get('company', '')}
@@ -277,74 +686,214 @@ class ResumeRAG:
         Requirements: {job_data.get('requirements', '')}
         """
         
-        doc = Document(
-            page_content=text,
-            metadata={
-                'title': job_data.get('title', ''),
-                'company': job_data.get('company', ''),
-                'location': job_data.get('location', ''),
-                'posted_by': user_email,
-                'posted_at': datetime.now().isoformat(),
-                'type': 'job'
-            }
-        )
+        metadata = {
+            'title': job_data.get('title', ''),
+            'company': job_data.get('company', ''),
+            'location': job_data.get('location', ''),
+            'posted_by': user_email,
+            'posted_at': datetime.now().isoformat(),
+            'type': 'job'
+        }
+        
+        doc_id = str(uuid.uuid4())
+        if job_id is not None:
+            metadata['job_id'] = job_id
+            doc_id = f'job-{job_id}'
         
-        self.job_db.add_documents([doc])
+        embedding = self.embeddings.embed_documents([text])[0]
+        self.job_db.add([doc_id], [embedding], [text], [metadata])
         self.job_db.persist()
+        
+        return embedding
     
-    def search_resumes(self, job_description, top_k=5):
-        results = self.resume_db.similarity_search_with_score(
-            job_description,
-            k=top_k
-        )
+    def delete_resume(self, resume):
+        """Tombstone a stored resume's vector"""
+        return self.resume_db.delete(self._doc_ids(self.resume_db, f"resume-{resume['id']}",
+                                                   {'filename': resume['filename']}))
+
+    def delete_job(self, job):
+        return self.job_db.delete(self._doc_ids(self.job_db, f"job-{job['id']}",
+                                                {'$and': [{'title': job['title']}, {'company': job['company']}]}))
+
+    def vector_stats(self):
+        return {
+            name: {'live': store.count(), 'tombstones': store.tombstone_count()}
+            for name, store in (('resumes', self.resume_db), ('jobs', self.job_db))
+        }
+
+    def save_search(self, name, job_description, user_email, threshold=DEFAULT_THRESHOLD):
+        embedding = self.embeddings.embed_query(job_description)
+        return self.saved_searches.create(name, job_description, embedding, user_email, threshold)
+    
+    def search_resumes(self, job_description, top_k=5, weights=None, filters=None):
+        candidate_k = max(top_k * RERANK_CANDIDATE_FACTOR, RERANK_MIN_CANDIDATES)
+        results = self.resume_search.query(self.embeddings.embed_query(job_description), candidate_k,
+                                           where_from_filters(filters))
+        return self._resume_matches(results, job_description, top_k, weights)
+    
+    def search_resumes_batch(self, queries):
+        """Run several searches at once: one model call for all query texts, lookups in parallel.
+
+        Each query is a dict with job_description and optional top_k, weights
+        and filters; results come back in input order.
+        """
+        wheres = [where_from_filters(query.get('filters')) for query in queries]
+        vectors = self.embeddings.embed_documents([query['job_description'] for query in queries])
+        
+        def run(query, vector, where):
+            top_k = query.get('top_k', 5)
+            candidate_k = max(top_k * RERANK_CANDIDATE_FACTOR, RERANK_MIN_CANDIDATES)
+            results = self.resume_search.query(vector, candidate_k, where)
+            return self._resume_matches(results, query['job_description'], top_k, query.get('weights'))
         
+        return list(batch_search_pool.map(run, queries, vectors, wheres))
+    
+    def search_resumes_for_job(self, job, top_k=5, weights=None, filters=None):
+        """Rank resumes against a stored job using its indexed vector, without running the model"""
+        vector = self._stored_vector(self.job_db, f"job-{job['id']}",
+                                     {'$and': [{'title': job['title']}, {'company': job['company']}]})
+        if vector is None:
+            return None
+        
+        candidate_k = max(top_k * RERANK_CANDIDATE_FACTOR, RERANK_MIN_CANDIDATES)
+        results = self.resume_search.query(vector, candidate_k, where_from_filters(filters))
+        job_text = f"{job.get('description') or ''}\n{job.get('requirements') or ''}"
+        return self._resume_matches(results, job_text, top_k, weights)
+    
+    def match_jobs(self, resume_text, top_k=5):
+        results = self.job_search.query(self.embeddings.embed_query(resume_text), top_k)
+        return self._job_matches(results)
+    
+    def match_jobs_for_resume(self, resume, top_k=5):
+        """Find jobs for a stored resume using its indexed vector, without running the model"""
+        vector = self._stored_vector(self.resume_db, f"resume-{resume['id']}",
+                                     {'filename': resume['filename']})
+        if vector is None:
+            return None
+        
+        results = self.job_search.query(vector, top_k)
+        return self._job_matches(results)
+    
+    def _doc_ids(self, store, doc_id, fallback_where):
+        """Vector ids of a row: its canonical id, or the metadata match for documents indexed without ids"""
+        if store.get(ids=[doc_id]):
+            return [doc_id]
+        return [record['id'] for record in store.get(where=fallback_where, limit=1)]
+
+    def _stored_vector(self, store, doc_id, fallback_where):
+        """Fetch an embedding by id, falling back to a metadata lookup for documents indexed without ids"""
+        records = store.get(ids=[doc_id], include_embeddings=True)
+        if not records:
+            records = store.get(where=fallback_where, limit=1, include_embeddings=True)
+        if not records:
+            return None
+        return records[0]['embedding']
+    
+    def _resume_matches(self, results, job_text, top_k, weights):
         matches = []
-        for doc, score in results:
-            skills_str = doc.metadata.get('skills', '[]')
+        for record, score in results:
+            metadata = record['metadata']
+            skills_str = metadata.get('skills', '[]')
             try:
                 skills = json.loads(skills_str) if skills_str else []
             except:
                 skills = []
             
             matches.append({
-                'filename': doc.metadata.get('filename'),
-                'name': doc.metadata.get('name'),
-                'email': doc.metadata.get('email'),
-                'phone': doc.metadata.get('phone'),
+                'resume_id': metadata.get('resume_id'),
+                'filename': metadata.get('filename'),
+                'name': metadata.get('name'),
+                'email': metadata.get('email'),
+                'phone': metadata.get('phone'),
                 'skills': skills,
-                'match_score': float(1 - score),
-                'preview': doc.page_content[:200]
+                'college': metadata.get('college', ''),
+                'degree': metadata.get('degree', ''),
+                'uploaded_at': metadata.get('uploaded_at', ''),
+                # Cosine, so the re-ranker's similarity feature spans 0..1 over real distances
+                'match_score': float(cosine_similarity(score)),
+                'preview': record['document'][:200]
             })
         
-        return matches
+        # Parsed sections from the rows; the indexed document always carries every section label
+        sections = get_resume_sections([match['resume_id'] for match in matches])
+        profiles = [dict(sections.get(match['resume_id'], {}), email=match['email'], phone=match['phone'])
+                    for match in matches]
+        return self.scorer.rerank(matches, profiles, extract_skills(job_text), top_k, weights)
     
-    def match_jobs(self, resume_text, top_k=5):
-        results = self.job_db.similarity_search_with_score(
-            resume_text,
-            k=top_k
-        )
-        
+    def _job_matches(self, results):
         matches = []
-        for doc, score in results:
+        for record, score in results:
+            metadata = record['metadata']
             matches.append({
-                'title': doc.metadata.get('title'),
-                'company': doc.metadata.get('company'),
-                'location': doc.metadata.get('location'),
+                'job_id': metadata.get('job_id'),
+                'title': metadata.get('title'),
+                'company': metadata.get('company'),
+                'location': metadata.get('location'),
                 'match_score': float(1 - score),
-                'description': doc.page_content[:300]
+                'description': record['document'][:300]
             })
         
         return matches
 
-rag_engine = ResumeRAG()
+def where_from_filters(filters):
+    """Metadata equality filter for a search, e.g. {'college': 'X'} scopes it to one college shard"""
+    if not filters:
+        return None
+    unknown = set(filters) - SEARCH_FILTER_FIELDS
+    if unknown:
+        raise ValueError(f"Unsupported filter fields: {', '.join(sorted(unknown))}")
+    clauses = [{key: value} for key, value in filters.items() if value not in (None, '')]
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {'$and': clauses}
+
+def parse_top_k(value, default=5):
+    """Requested result count clamped to 1..MAX_TOP_K; ValueError when it is not an integer"""
+    if value is None:
+        return default
+    try:
+        top_k = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"top_k must be an integer, got {value!r}")
+    return min(max(top_k, 1), MAX_TOP_K)
+
+def parse_weights(value):
+    """Re-ranking weight overrides as {feature: float}; ValueError unless a dict of known features to numbers >= 0"""
+    if value is None:
+        return None
+    if not isinstance(value, dict):
+        raise ValueError("weights must be an object of feature weights")
+    unknown = set(value) - set(DEFAULT_WEIGHTS)
+    if unknown:
+        raise ValueError(f"Unknown weight features: {', '.join(sorted(unknown))}")
+    weights = {}
+    for name, weight in value.items():
+        if isinstance(weight, bool) or not isinstance(weight, (int, float)) or not 0 <= weight < float('inf'):
+            raise ValueError(f"Weight {name} must be a non-negative number, got {weight!r}")
+        weights[name] = float(weight)
+    return weights
+
+saved_search_index = SavedSearchIndex(get_db)
+resume_skill_index = skill_index.SkillIndex(get_db)
+rag_engine = ResumeRAG(saved_search_index)
+
+COMMON_SKILLS = [
+    'python', 'java', 'javascript', 'c++', 'c#', 'ruby', 'php', 'swift', 'kotlin',
+    'typescript', 'go', 'rust', 'scala', 'html', 'css', 'react', 'angular', 'vue',
+    'node.js', 'express', 'django', 'flask', 'spring', 'asp.net', 'bootstrap',
+    'tailwind', 'sql', 'mysql', 'postgresql', 'mongodb', 'oracle', 'redis',
+    'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'jenkins', 'git', 'ci/cd',
+    'machine learning', 'deep learning', 'tensorflow', 'pytorch', 'pandas',
+    'numpy', 'ai', 'nlp', 'agile', 'scrum', 'rest api', 'microservices'
+]
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def extract_text_from_pdf(filepath):
+def extract_text_from_pdf(source):
     try:
         text = ""
-        with open(filepath, 'rb') as file:
+        with open_source(source) as file:
             pdf_reader = PyPDF2.PdfReader(file)
             for page in pdf_reader.pages:
                 page_text = page.extract_text()
@@ -355,31 +904,39 @@ def extract_text_from_pdf(filepath):
         print(f"Error reading PDF: {str(e)}")
         return ""
 
-def extract_text_from_docx(filepath):
+def extract_text_from_docx(source):
     try:
-        doc = DocxDocument(filepath)
-        text = ""
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
-        return text
+        return extract_docx_text(source)
     except Exception as e:
         print(f"Error reading DOCX: {str(e)}")
         return ""
 
-def extract_text_from_txt(filepath):
+def extract_text_from_txt(source):
     try:
-        with open(filepath, 'r', encoding='utf-8', errors='ignore') as file:
-            return file.read()
+        return read_bytes(source).decode('utf-8', errors='ignore')
     except Exception as e:
         print(f"Error reading TXT: {str(e)}")
         return ""
 
+def extract_text(source, file_type=None):
+    """Extract text from a path, bytes buffer or stream, sniffing the format if not given"""
+    file_type = file_type or detect_file_type(source)
+    if file_type == 'pdf':
+        return extract_text_from_pdf(source)
+    if file_type in ['docx', 'doc']:
+        return extract_text_from_docx(source)
+    if file_type == 'zip':
+        return ""
+    return extract_text_from_txt(source)
+
 def extract_resume_data(text, filename):
     if not text:
         return {
             'name': 'Unknown',
             'email': '',
             'phone': '',
+            'linkedin': '',
+            'github': '',
             'skills': [],
             'experience': '',
             'education': '',
@@ -393,53 +950,45 @@ def extract_resume_data(text, filename):
             name = line
             break
     
-    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-    email_match = re.search(email_pattern, text)
-    email = email_match.group(0) if email_match else ""
-    
-    phone_patterns = [
-        r'\+?\d{1,3}[-.\s]?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}',
-        r'\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}',
-        r'\d{10}',
-    ]
-    phone = ""
-    for pattern in phone_patterns:
-        phone_match = re.search(pattern, text)
-        if phone_match:
-            phone = phone_match.group(0)
-            break
-    
-    common_skills = [
-        'python', 'java', 'javascript', 'c++', 'c#', 'ruby', 'php', 'swift', 'kotlin',
-        'typescript', 'go', 'rust', 'scala', 'html', 'css', 'react', 'angular', 'vue',
-        'node.js', 'express', 'django', 'flask', 'spring', 'asp.net', 'bootstrap',
-        'tailwind', 'sql', 'mysql', 'postgresql', 'mongodb', 'oracle', 'redis',
-        'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'jenkins', 'git', 'ci/cd',
-        'machine learning', 'deep learning', 'tensorflow', 'pytorch', 'pandas',
-        'numpy', 'ai', 'nlp', 'agile', 'scrum', 'rest api', 'microservices'
-    ]
-    
-    text_lower = text.lower()
-    skills = []
-    for skill in common_skills:
-        if skill in text_lower:
-            skills.append(skill.title())
+    # Only called to fill the parse cache, which must never keep a budget-truncated result
+    contacts = extract_contacts(text, budget=None)
     
-    skills = sorted(list(set(skills)))
+    skills = extract_skills(text)
     
     experience = extract_section(text, ['experience', 'work history', 'employment'])
     education = extract_section(text, ['education', 'academic', 'qualification'])
     
     return {
         'name': name,
-        'email': email,
-        'phone': phone,
+        'email': contacts['email'],
+        'phone': contacts['phone'],
+        'linkedin': contacts['linkedin'],
+        'github': contacts['github'],
         'skills': skills,
         'experience': experience,
         'education': education,
         'raw_text': text[:500]
     }
 
+def parse_resume_bytes(data, filename):
+    """Extracted text and parsed fields of a file, reused from the parse cache when its content was seen before"""
+    digest = content_hash(data)
+    text = parse_cache.fetch('text', TEXT_EXTRACTOR_VERSION, digest,
+                             lambda: extract_text(data, detect_file_type(data)))
+    # Parsed fields derive from the text, so they are invalidated by either version
+    resume_data = parse_cache.fetch('resume', f'{TEXT_EXTRACTOR_VERSION}.{RESUME_DATA_VERSION}', digest,
+                                    lambda: extract_resume_data(text, filename))
+    return text, resume_data
+
+def extract_skills(text):
+    text_lower = text.lower()
+    skills = []
+    for skill in COMMON_SKILLS:
+        if skill in text_lower:
+            skills.append(skill.title())
+    
+    return sorted(list(set(skills)))
+
 def extract_section(text, keywords):
     text_lower = text.lower()
     lines = text.split('\n')
@@ -455,13 +1004,36 @@ def extract_section(text, keywords):
 
 @app.route('/')
 def index():
-    frontend_folder = os.path.join(BASE_DIR, 'frontend')
-    return send_from_directory(frontend_folder, 'index.html')
+    return serve_static('index.html')
 
 @app.route('/<path:path>')
 def serve_static(path):
-    frontend_folder = os.path.join(BASE_DIR, 'frontend')
-    return send_from_directory(frontend_folder, path)
+    # API typos get an API answer, not a filesystem lookup
+    if path == 'api' or path.startswith('api/'):
+        methods = set(app.url_map.bind_to_environ(request.environ).allowed_methods()) - {'GET', 'HEAD', 'OPTIONS'}
+        if methods:
+            return jsonify({'error': 'Method Not Allowed'}), 405, {'Allow': ', '.join(sorted(methods))}
+        return jsonify({'error': 'Not found'}), 404
+    if static_assets is not None and path in static_assets:
+        return static_assets.response(path, request, app.response_class)
+    return send_from_directory(FRONTEND_DIR, path)
+
+@app.errorhandler(404)
+@app.errorhandler(405)
+def api_error(e):
+    """JSON errors for unknown API routes and methods"""
+    if not (request.path == '/api' or request.path.startswith('/api/')):
+        return e
+    if e.code == 405:
+        # Any path matches the GET-only static catch-all, so an unknown API path
+        # with another method surfaces as 405; report it as the 404 it is
+        try:
+            endpoint, _ = app.url_map.bind_to_environ(request.environ).match(method='GET')
+        except HTTPException:
+            endpoint = None
+        if endpoint == 'serve_static':
+            return jsonify({'error': 'Not found'}), 404
+    return jsonify({'error': e.name}), e.code
 
 @app.route('/api/signup', methods=['POST'])
 def signup():
@@ -533,12 +1105,46 @@ def check_auth():
         })
     return jsonify({'authenticated': False})
 
+def login_required(view):
+    """401 before the view runs; goes outside admission_controlled so anonymous requests never take a slot"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if 'user_email' not in session:
+            return jsonify({'error': 'Please login first'}), 401
+        return view(*args, **kwargs)
+    return wrapper
+
+def _ingest_upload(file, college, degree):
+    """Store an uploaded resume file under a unique name and parse it"""
+    filename = secure_filename(file.filename)
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    name, ext = os.path.splitext(filename)
+    unique_filename = f"{name}_{timestamp}{ext}"
+    filepath = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
+
+    # Parse straight from the request buffer; the original is persisted in parallel
+    data = file.stream.read()
+    saved = upload_writer.submit(persist_bytes, data, filepath)
+
+    text, resume_data = parse_resume_bytes(data, unique_filename)
+    resume_data['college'] = college
+    resume_data['degree'] = degree
+
+    saved.result()
+    print(f"File saved to: {filepath}")
+    return unique_filename, resume_data, text
+
+def _remove_upload(filename):
+    try:
+        os.remove(os.path.join(app.config['UPLOAD_FOLDER'], secure_filename(filename)))
+    except OSError:
+        pass
+
 @app.route('/api/upload-resume', methods=['POST'])
+@login_required
+@admission_controlled(admission['upload'])
 def upload_resume():
     try:
-        if 'user_email' not in session:
-            return jsonify({'error': 'Please login first'}), 401
-        
         if 'resume' not in request.files:
             return jsonify({'error': 'No file uploaded'}), 400
         
@@ -550,33 +1156,14 @@ def upload_resume():
             return jsonify({'error': 'No file selected'}), 400
         
         if file and allowed_file(file.filename):
-            filename = secure_filename(file.filename)
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            name, ext = os.path.splitext(filename)
-            unique_filename = f"{name}_{timestamp}{ext}"
-            filepath = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
+            unique_filename, resume_data, text = _ingest_upload(file, college, degree)
             
-            file.save(filepath)
-            print(f"File saved to: {filepath}")
-            
-            file_extension = unique_filename.rsplit('.', 1)[1].lower()
-            
-            if file_extension == 'pdf':
-                text = extract_text_from_pdf(filepath)
-            elif file_extension in ['docx', 'doc']:
-                text = extract_text_from_docx(filepath)
-            else:
-                text = extract_text_from_txt(filepath)
-            
-            resume_data = extract_resume_data(text, unique_filename)
-            resume_data['college'] = college
-            resume_data['degree'] = degree
-            
-            save_resume(resume_data, unique_filename, session['user_email'], college, degree)
-            rag_engine.add_resume(resume_data, unique_filename, session['user_email'])
+            resume_id = save_resume(resume_data, unique_filename, session['user_email'], college, degree, text)
+            rag_engine.add_resume(resume_data, unique_filename, session['user_email'], resume_id)
             
             return jsonify({
                 'success': True,
+                'resume_id': resume_id,
                 'filename': unique_filename,
                 'data': resume_data
             })
@@ -588,25 +1175,143 @@ def upload_resume():
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/search-resumes', methods=['POST'])
+@login_required
+@admission_controlled(admission['search'])
 def search_resumes():
+    try:
+        data = request.get_json()
+        job_description = data.get('job_description', '')
+        filters = data.get('filters')
+        
+        try:
+            top_k = parse_top_k(data.get('top_k'))
+            weights = parse_weights(data.get('weights'))
+            matches = rag_engine.search_resumes(job_description, top_k, weights, filters)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return jsonify({
+            'success': True,
+            'matches': matches
+        })
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/search-resumes/batch', methods=['POST'])
+@login_required
+@admission_controlled(admission['batch_search'])
+def search_resumes_batch():
+    try:
+        data = request.get_json()
+        queries = data.get('queries')
+        if not isinstance(queries, list) or not queries:
+            return jsonify({'error': 'A non-empty list of queries is required'}), 400
+        if len(queries) > BATCH_SEARCH_MAX_QUERIES:
+            return jsonify({'error': f'At most {BATCH_SEARCH_MAX_QUERIES} queries per request'}), 400
+        
+        for i, query in enumerate(queries):
+            if not isinstance(query, dict) or not query.get('job_description'):
+                return jsonify({'error': f'Query {i}: job_description required'}), 400
+            try:
+                query['top_k'] = parse_top_k(query.get('top_k'))
+                query['weights'] = parse_weights(query.get('weights'))
+                where_from_filters(query.get('filters'))
+            except (TypeError, ValueError) as e:
+                return jsonify({'error': f'Query {i}: {e}'}), 400
+        
+        results = rag_engine.search_resumes_batch(queries)
+        
+        return jsonify({
+            'success': True,
+            'results': [{'matches': matches} for matches in results]
+        })
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/saved-searches', methods=['POST'])
+def create_saved_search():
     try:
         if 'user_email' not in session:
             return jsonify({'error': 'Please login first'}), 401
         
         data = request.get_json()
         job_description = data.get('job_description', '')
-        top_k = data.get('top_k', 5)
+        if not job_description:
+            return jsonify({'error': 'job_description required'}), 400
+        
+        name = data.get('name') or job_description[:50]
+        threshold = data.get('threshold')
+        if threshold is None:
+            threshold = DEFAULT_THRESHOLD
+        # Match scores are at most 1, so a threshold outside 0..1 matches everything or nothing
+        if isinstance(threshold, bool) or not isinstance(threshold, (int, float)) or not 0 <= threshold <= 1:
+            return jsonify({'error': f'threshold must be a number between 0 and 1, got {threshold!r}'}), 400
         
-        matches = rag_engine.search_resumes(job_description, top_k)
+        search_id = rag_engine.save_search(name, job_description, session['user_email'], threshold)
         
         return jsonify({
             'success': True,
-            'matches': matches
+            'search_id': search_id
         })
     except Exception as e:
         print(f"Error: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/saved-searches', methods=['GET'])
+def list_saved_searches():
+    try:
+        if 'user_email' not in session:
+            return jsonify({'error': 'Please login first'}), 401
+        
+        return jsonify({
+            'success': True,
+            'searches': saved_search_index.list(session['user_email'])
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/saved-searches/<int:search_id>', methods=['DELETE'])
+def delete_saved_search(search_id):
+    try:
+        if 'user_email' not in session:
+            return jsonify({'error': 'Please login first'}), 401
+        
+        if not saved_search_index.delete(search_id, session['user_email']):
+            return jsonify({'error': 'Saved search not found'}), 404
+        
+        return jsonify({'success': True})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/saved-searches/<int:search_id>/hits', methods=['GET'])
+def saved_search_hits(search_id):
+    try:
+        if 'user_email' not in session:
+            return jsonify({'error': 'Please login first'}), 401
+        
+        if not saved_search_index.get(search_id, session['user_email']):
+            return jsonify({'error': 'Saved search not found'}), 404
+        
+        since = request.args.get('since', 0, type=int)
+        limit = min(request.args.get('limit', 50, type=int), 500)
+        hits = saved_search_index.hits(search_id, since, limit)
+        for hit in hits:
+            if hit.get('skills'):
+                try:
+                    hit['skills'] = json.loads(hit['skills'])
+                except:
+                    hit['skills'] = []
+        
+        return jsonify({
+            'success': True,
+            'hits': hits,
+            'next_since': hits[-1]['id'] if hits else since
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/add-job', methods=['POST'])
 def add_job():
     try:
@@ -615,11 +1320,12 @@ def add_job():
         
         data = request.get_json()
         
-        save_job(data, session['user_email'])
-        rag_engine.add_job(data, session['user_email'])
+        job_id = save_job(data, session['user_email'])
+        rag_engine.add_job(data, session['user_email'], job_id)
         
         return jsonify({
             'success': True,
+            'job_id': job_id,
             'message': 'Job posted successfully'
         })
     except Exception as e:
@@ -627,12 +1333,20 @@ def add_job():
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/match-jobs', methods=['POST'])
+@login_required
+@admission_controlled(admission['match'])
 def match_jobs():
     try:
-        if 'user_email' not in session:
-            return jsonify({'error': 'Please login first'}), 401
-        
         data = request.get_json()
+        
+        # Prefer the stored vector when the client refers to an uploaded resume
+        if data.get('resume_id') is not None:
+            try:
+                resume_id = int(data['resume_id'])
+            except (TypeError, ValueError):
+                return jsonify({'error': f"resume_id must be an integer, got {data['resume_id']!r}"}), 400
+            return _match_jobs_by_resume(resume_id)
+        
         resume_text = data.get('resume_text', '')
         
         matches = rag_engine.match_jobs(resume_text, 5)
@@ -645,6 +1359,332 @@ def match_jobs():
         print(f"Error: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/match-jobs/<int:resume_id>', methods=['GET'])
+@login_required
+@admission_controlled(admission['match'])
+def match_jobs_by_resume(resume_id):
+    return _match_jobs_by_resume(resume_id)
+
+def _match_jobs_by_resume(resume_id):
+    try:
+        resume = get_resume(resume_id)
+        if not resume:
+            return jsonify({'error': 'Resume not found'}), 404
+        
+        try:
+            top_k = parse_top_k(request.args.get('top_k'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        matches = rag_engine.match_jobs_for_resume(resume, top_k)
+        if matches is None:
+            return jsonify({'error': 'Resume is not indexed'}), 404
+        
+        return jsonify({
+            'success': True,
+            'resume_id': resume_id,
+            'jobs': matches
+        })
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/match-resumes/<int:job_id>', methods=['GET'])
+@login_required
+@admission_controlled(admission['search'])
+def match_resumes_by_job(job_id):
+    try:
+        job = get_job(job_id)
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+        
+        try:
+            top_k = parse_top_k(request.args.get('top_k'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        filters = {field: request.args[field] for field in SEARCH_FILTER_FIELDS if request.args.get(field)}
+        matches = rag_engine.search_resumes_for_job(job, top_k, filters=filters)
+        if matches is None:
+            return jsonify({'error': 'Job is not indexed'}), 404
+        
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'matches': matches
+        })
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admission-stats', methods=['GET'])
+def admission_stats():
+    """Queue-depth gauges and rejection counters for tuning the admission limits"""
+    if 'user_email' not in session:
+        return jsonify({'error': 'Please login first'}), 401
+    
+    return jsonify({
+        'success': True,
+        'endpoints': {name: controller.stats() for name, controller in admission.items()}
+    })
+
+@app.route('/api/admin/profiles', methods=['GET'])
+def list_profiles():
+    if not profiler.is_authorized(request):
+        return jsonify({'error': 'Not authorized'}), 403
+    
+    return jsonify({
+        'success': True,
+        'profiles': profiler.list_profiles(request.args.get('route'))
+    })
+
+@app.route('/api/admin/profiles/<profile_id>', methods=['GET'])
+def profile_hot_spots(profile_id):
+    if not profiler.is_authorized(request):
+        return jsonify({'error': 'Not authorized'}), 403
+    
+    sort = request.args.get('sort', 'cumulative')
+    limit = request.args.get('limit', 25, type=int)
+    report = profiler.top_functions(profile_id, sort, limit)
+    if report is None:
+        return jsonify({'error': 'Profile not found'}), 404
+    
+    return jsonify({
+        'success': True,
+        'profile_id': profile_id,
+        **report
+    })
+
+@app.route('/api/admin/profiles/<profile_id>/download', methods=['GET'])
+def download_profile(profile_id):
+    if not profiler.is_authorized(request):
+        return jsonify({'error': 'Not authorized'}), 403
+    
+    path = profiler.profile_path(profile_id)
+    if path is None:
+        return jsonify({'error': 'Profile not found'}), 404
+    
+    return send_file(path, as_attachment=True, download_name=f'{profile_id}.prof')
+
+@app.route('/api/resumes/<int:resume_id>', methods=['PUT'])
+@login_required
+@admission_controlled(admission['upload'])
+def replace_resume(resume_id):
+    """Re-upload a resume file and/or change its college and degree, keeping the id"""
+    try:
+        resume = get_resume(resume_id)
+        if not resume:
+            return jsonify({'error': 'Resume not found'}), 404
+        if resume['uploaded_by'] != session['user_email']:
+            return jsonify({'error': 'You can only change resumes you uploaded'}), 403
+
+        college = request.form.get('college', resume['college'] or '')
+        degree = request.form.get('degree', resume['degree'] or '')
+        file = request.files.get('resume')
+
+        if file and file.filename:
+            if not allowed_file(file.filename):
+                return jsonify({'error': 'Invalid file type'}), 400
+            filename, resume_data, text = _ingest_upload(file, college, degree)
+        else:
+            filename = resume['filename']
+            text = get_resume_text(resume_id)
+            resume_data = {
+                'name': resume['name'],
+                'email': resume['email'],
+                'phone': resume['phone'],
+                'skills': json.loads(resume['skills']) if resume['skills'] else [],
+                'experience': resume['experience'],
+                'education': resume['education'],
+                'raw_text': resume['raw_text'],
+                'college': college,
+                'degree': degree
+            }
+
+        # Vectors first, then rows: a retry after a failure in between converges
+        rag_engine.delete_resume(resume)
+        rag_engine.add_resume(resume_data, filename, resume['uploaded_by'], resume_id)
+        update_resume(resume, resume_data, filename, college, degree, text)
+        if filename != resume['filename']:
+            _remove_upload(resume['filename'])
+
+        return jsonify({
+            'success': True,
+            'resume_id': resume_id,
+            'filename': filename,
+            'data': resume_data
+        })
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/reprocess-resumes', methods=['POST'])
+@login_required
+@admission_controlled(admission['upload'])
+def reprocess_resumes():
+    """Re-parse the user's uploaded files and refresh rows whose parsed fields changed.
+
+    Unchanged files are read back from the parse cache instead of being parsed
+    again; pass {"reembed": true} to re-embed every resume, e.g. after a model change.
+    """
+    try:
+        reembed = bool((request.get_json(silent=True) or {}).get('reembed'))
+        before = parse_cache.stats()
+
+        conn = get_db()
+        c = conn.cursor()
+        c.execute('SELECT * FROM resumes WHERE uploaded_by = ? ORDER BY id', (session['user_email'],))
+        resumes = [dict(row) for row in c.fetchall()]
+        conn.close()
+
+        fields = ['name', 'email', 'phone', 'experience', 'education', 'raw_text']
+        updated = missing = reembedded = 0
+        for resume in resumes:
+            filepath = os.path.join(app.config['UPLOAD_FOLDER'], resume['filename'])
+            if not os.path.isfile(filepath):
+                missing += 1
+                continue
+
+            text, resume_data = parse_resume_bytes(read_bytes(filepath), resume['filename'])
+            resume_data['college'] = resume['college'] or ''
+            resume_data['degree'] = resume['degree'] or ''
+            stored_skills = json.loads(resume['skills']) if resume['skills'] else []
+            # Rows from before full texts were kept only hold the preview, so they are refreshed too
+            changed = (resume_data.get('skills') != stored_skills or
+                       any(resume_data.get(field) != resume[field] for field in fields) or
+                       get_resume_text(resume['id']) != text)
+
+            if changed or reembed:
+                rag_engine.delete_resume(resume)
+                rag_engine.add_resume(resume_data, resume['filename'], resume['uploaded_by'], resume['id'],
+                                      evaluate_searches=False)
+                reembedded += 1
+            if changed:
+                update_resume(resume, resume_data, resume['filename'], resume_data['college'],
+                              resume_data['degree'], text, export=False)
+                updated += 1
+
+        if updated:
+            export_to_excel()
+
+        after = parse_cache.stats()
+        return jsonify({
+            'success': True,
+            'processed': len(resumes) - missing,
+            'updated': updated,
+            'reembedded': reembedded,
+            'missing_files': missing,
+            'cache': {key: after[key] - before[key] for key in after}
+        })
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/resumes/<int:resume_id>', methods=['DELETE'])
+def remove_resume(resume_id):
+    try:
+        if 'user_email' not in session:
+            return jsonify({'error': 'Please login first'}), 401
+
+        resume = get_resume(resume_id)
+        if not resume:
+            return jsonify({'error': 'Resume not found'}), 404
+        if resume['uploaded_by'] != session['user_email']:
+            return jsonify({'error': 'You can only delete resumes you uploaded'}), 403
+
+        rag_engine.delete_resume(resume)
+        delete_resume(resume)
+        _remove_upload(resume['filename'])
+
+        return jsonify({'success': True, 'message': 'Resume deleted'})
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/jobs/<int:job_id>', methods=['PUT'])
+def replace_job(job_id):
+    try:
+        if 'user_email' not in session:
+            return jsonify({'error': 'Please login first'}), 401
+
+        job = get_job(job_id)
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+        if job['posted_by'] != session['user_email']:
+            return jsonify({'error': 'You can only change jobs you posted'}), 403
+
+        data = request.get_json() or {}
+        fields = ['title', 'company', 'location', 'description', 'requirements']
+        job_data = {field: data.get(field, job[field]) for field in fields}
+        if not job_data['title'] or not job_data['company'] or not job_data['location']:
+            return jsonify({'error': 'Title, company and location are required'}), 400
+
+        rag_engine.delete_job(job)
+        rag_engine.add_job(job_data, job['posted_by'], job_id)
+        update_job(job, job_data)
+
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'message': 'Job updated successfully'
+        })
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/jobs/<int:job_id>', methods=['DELETE'])
+def remove_job(job_id):
+    try:
+        if 'user_email' not in session:
+            return jsonify({'error': 'Please login first'}), 401
+
+        job = get_job(job_id)
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+        if job['posted_by'] != session['user_email']:
+            return jsonify({'error': 'You can only delete jobs you posted'}), 403
+
+        rag_engine.delete_job(job)
+        delete_job(job)
+
+        return jsonify({'success': True, 'message': 'Job deleted'})
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/resumes/<int:resume_id>/text', methods=['GET'])
+def resume_text(resume_id):
+    """Full extracted text of one resume"""
+    try:
+        if 'user_email' not in session:
+            return jsonify({'error': 'Please login first'}), 401
+
+        text = get_resume_text(resume_id)
+        if text is None:
+            return jsonify({'error': 'Resume not found'}), 404
+
+        return jsonify({'success': True, 'resume_id': resume_id, 'text': text})
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/text-storage', methods=['GET'])
+def text_storage():
+    """Compressed full-text storage against plain text"""
+    if 'user_email' not in session:
+        return jsonify({'error': 'Please login first'}), 401
+
+    conn = get_db()
+    report = resume_text_store.report(conn)
+    conn.close()
+    return jsonify({'success': True, 'storage': report})
+
+@app.route('/api/vector-stats', methods=['GET'])
+def vector_stats():
+    """Live and tombstoned document counts per collection"""
+    if 'user_email' not in session:
+        return jsonify({'error': 'Please login first'}), 401
+
+    return jsonify({'success': True, 'collections': rag_engine.vector_stats()})
+
 @app.route('/api/get-resumes', methods=['GET'])
 def get_resumes():
     try:
@@ -678,6 +1718,100 @@ def get_jobs():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/skill-search', methods=['POST'])
+def skill_search():
+    try:
+        if 'user_email' not in session:
+            return jsonify({'error': 'Please login first'}), 401
+        
+        try:
+            data = request.get_json()
+        except RecursionError:
+            return jsonify({'error': 'Skill query is nested too deeply'}), 400
+        query = data.get('query')
+        if not query:
+            return jsonify({'error': 'Skill query required'}), 400
+        try:
+            limit = min(max(int(data.get('limit', 50)), 1), 1000)
+            offset = max(int(data.get('offset', 0)), 0)
+        except (TypeError, ValueError):
+            return jsonify({'error': 'limit and offset must be integers'}), 400
+        
+        try:
+            result = resume_skill_index.search(query, data.get('college'), data.get('degree'), limit, offset)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return jsonify({
+            'success': True,
+            'total': result['total'],
+            'resume_ids': result['ids'],
+            'limit': limit,
+            'offset': offset
+        })
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/analytics/skills', methods=['GET'])
+def analytics_skills():
+    if 'user_email' not in session:
+        return jsonify({'error': 'Please login first'}), 401
+    
+    limit = min(request.args.get('limit', 50, type=int), 500)
+    conn = get_db()
+    skills = corpus_analytics.top_counts(conn, corpus_analytics.SKILL, limit)
+    conn.close()
+    return jsonify({'success': True, 'skills': skills})
+
+@app.route('/api/analytics/skills-by-education', methods=['GET'])
+def analytics_skills_by_education():
+    if 'user_email' not in session:
+        return jsonify({'error': 'Please login first'}), 401
+    
+    limit = min(request.args.get('limit', 50, type=int), 500)
+    conn = get_db()
+    skills = corpus_analytics.skills_by_education(conn, request.args.get('college'), request.args.get('degree'), limit)
+    conn.close()
+    return jsonify({'success': True, 'skills': skills})
+
+@app.route('/api/analytics/uploads-per-day', methods=['GET'])
+def analytics_uploads_per_day():
+    if 'user_email' not in session:
+        return jsonify({'error': 'Please login first'}), 401
+    
+    days = min(request.args.get('days', 30, type=int), 3650)
+    conn = get_db()
+    uploads = corpus_analytics.uploads_per_day(conn, days)
+    conn.close()
+    return jsonify({'success': True, 'uploads': uploads})
+
+@app.route('/api/analytics/jobs', methods=['GET'])
+def analytics_jobs():
+    if 'user_email' not in session:
+        return jsonify({'error': 'Please login first'}), 401
+    
+    limit = min(request.args.get('limit', 50, type=int), 500)
+    conn = get_db()
+    result = {
+        'success': True,
+        'by_company': corpus_analytics.top_counts(conn, corpus_analytics.JOB_COMPANY, limit),
+        'by_location': corpus_analytics.top_counts(conn, corpus_analytics.JOB_LOCATION, limit),
+        'by_company_location': corpus_analytics.job_locations(conn, request.args.get('company'), limit)
+    }
+    conn.close()
+    return jsonify(result)
+
+@app.route('/api/analytics/sections', methods=['GET'])
+def analytics_sections():
+    if 'user_email' not in session:
+        return jsonify({'error': 'Please login first'}), 401
+    
+    conn = get_db()
+    coverage = corpus_analytics.resume_coverage(conn)
+    conn.close()
+    return jsonify({'success': True, 'coverage': coverage})
+
 @app.route('/api/add-student', methods=['POST'])
 def add_student():
     try:
@@ -0,0 +1,102 @@
+import re
+import time
+
+# One pattern, one scan. Every quantifier is bounded and every alternative can
+# only start at a token boundary (the lookbehinds), so each position costs a
+# bounded number of steps and a scan is linear in the length of the text.
+_EMAIL = (r'(?<![A-Za-z0-9._%+-])'
+          r'[A-Za-z0-9._%+-]{1,64}@[A-Za-z0-9-]{1,63}(?:\.[A-Za-z0-9-]{1,63}){0,8}\.[A-Za-z]{2,24}'
+          r'(?![A-Za-z0-9-])')
+_URL = (r'(?<![\w./-])(?i:(?:https?://)?(?:www\.)?'
+        r'(?:(?P<linkedin>linkedin\.com/in/[\w%-]{1,100})|(?P<github>github\.com/[\w-]{1,39})))'
+        r'(?![\w-])')
+# Optional country code, then up to six digit groups. Groups after the first need a separator
+# or parentheses, so a digit run splits only one way; PHONE_DIGITS is checked on the match
+_PHONE = (r'(?<![\w+(])'
+          r'(?:\+\d{1,3}[-. ]?)?'
+          r'(?:\(\d{1,5}\)|\d{1,15})'
+          r'(?:[-. ]?\(\d{1,5}\)|[-. ]\d{1,15}){0,5}'
+          r'(?!\d)')
+CONTACT_PATTERN = re.compile(f'(?P<email>{_EMAIL})|{_URL}|(?P<phone>{_PHONE})')
+
+FIELDS = ('email', 'phone', 'linkedin', 'github')
+# Digits in a phone number, country code included (E.164 allows at most 15)
+PHONE_DIGITS = (10, 15)
+# No match is longer than this (the longest is an email of 64 + 1 + 63 + 8 * 64 + 1 + 24 = 665
+# characters), so chunks overlapping by it never split or truncate one
+MAX_MATCH = 1024
+CHUNK_SIZE = 64 * 1024
+# Wall-clock budget per document; fields not found by then are left empty
+DEFAULT_BUDGET = 0.05
+
+
+def extract_contacts(text, budget=DEFAULT_BUDGET):
+    """First email, phone, LinkedIn and GitHub URL in text, from one scan.
+
+    The text is scanned in chunks and the budget (seconds, None for no limit)
+    is checked between them, so one pathological document cannot hold up a
+    bulk parse. Results that are stored for reuse should be extracted with
+    budget=None, or a truncated scan would be kept.
+    """
+    found = dict.fromkeys(FIELDS, '')
+    missing = len(FIELDS)
+    deadline = None if budget is None else time.perf_counter() + budget
+    position = 0
+    length = len(text or '')
+    while position < length and missing:
+        boundary = position + CHUNK_SIZE
+        resume_at = boundary
+        for match in CONTACT_PATTERN.finditer(text, position, min(boundary + MAX_MATCH, length)):
+            if match.start() >= boundary:
+                break
+            resume_at = max(boundary, match.end())
+            field = match.lastgroup
+            if field == 'phone':
+                digits = sum(ch.isdigit() for ch in match.group(field))
+                if not PHONE_DIGITS[0] <= digits <= PHONE_DIGITS[1]:
+                    continue
+            if not found[field]:
+                found[field] = match.group(field)
+                missing -= 1
+                if not missing:
+                    break
+        position = resume_at
+        if deadline is not None and time.perf_counter() > deadline:
+            break
+    return found
+
+
+if __name__ == '__main__':
+    # Timing against the patterns the extractor replaced: python contact_fields.py
+    # (correctness and linearity checks live in tests/test_contact_fields.py)
+    import random
+
+    legacy = [re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'),
+              re.compile(r'[\+\(]?[1-9][0-9 .\-\(\)]{8,}[0-9]')]
+
+    rng = random.Random(3)
+    generators = {
+        'dotted words': lambda n: 'a.' * (n // 2),
+        'at-signs': lambda n: 'a@a' * (n // 3),
+        'digit runs': lambda n: '1 ' * (n // 2) + 'x',
+        'domain-like': lambda n: 'a@' + 'b-' * (n // 2),
+        'phone groups': lambda n: '+12 (345) 6-7.8 1234567890123456 ' * (n // 33),
+        'random symbols': lambda n: ''.join(rng.choice('a1.@-+( )/:\n') for _ in range(n)),
+    }
+
+    def timed(function, text):
+        start = time.perf_counter()
+        function(text)
+        return time.perf_counter() - start
+
+    print(f'{"input":16s} {"size":>8s} {"extract":>10s} {"legacy":>10s}')
+    for name, generate in generators.items():
+        for size in (10_000, 20_000, 40_000):
+            text = generate(size)
+            new = timed(lambda t: extract_contacts(t, budget=None), text)
+            old = timed(lambda t: [pattern.findall(t) for pattern in legacy], text)
+            print(f'{name:16s} {size:8d} {new * 1000:8.2f}ms {old * 1000:8.2f}ms')
+
+    # The budget bounds a huge document regardless
+    elapsed = timed(lambda t: extract_contacts(t, budget=0.01), 'a.' * 5_000_000)
+    print(f'10 MB with a 10 ms budget: {elapsed * 1000:.1f} ms')
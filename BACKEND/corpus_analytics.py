@@ -0,0 +1,214 @@
+import json
+import re
+from collections import Counter
+
+# Same checks as ResumeRAG.analyze_resume
+SECTIONS = ['experience', 'education', 'skills', 'projects']
+CONTACT_MARKERS = ['email', 'phone', '@']
+SUGGESTIONS = {
+    'experience': 'Consider adding an Experience section',
+    'skills': 'Add a Skills section to highlight your abilities'
+}
+# Every section and contact marker found in a single scan of the lower-cased text
+_MARKERS = re.compile('|'.join(re.escape(marker) for marker in SECTIONS + CONTACT_MARKERS))
+
+# analytics_counts dimensions
+SKILL = 'skill'
+UPLOAD_DAY = 'upload_day'
+JOB_COMPANY = 'job_company'
+JOB_LOCATION = 'job_location'
+RESUME_STATS = 'resume_stats'
+
+ANALYTICS_VERSION = '2'
+
+
+def text_features(text):
+    """Sections present, contact flag and word count of one resume"""
+    found = set(_MARKERS.findall(text.lower()))
+    return {
+        'sections': [section for section in SECTIONS if section in found],
+        'has_contact': any(marker in found for marker in CONTACT_MARKERS),
+        'word_count': len(text.split())
+    }
+
+
+def _resume_stat_deltas(features):
+    deltas = Counter({'resumes': 1, 'words': features['word_count']})
+    deltas.update(f'section:{section}' for section in features['sections'])
+    if features['has_contact']:
+        deltas['contact'] += 1
+    return deltas
+
+
+def section_coverage(texts):
+    """Batch analyze_resume: section and contact coverage across many resumes in one pass"""
+    stats = Counter()
+    for text in texts:
+        stats.update(_resume_stat_deltas(text_features(text or '')))
+    return coverage_report(stats)
+
+
+def coverage_report(stats):
+    total = stats.get('resumes', 0)
+
+    def share(count):
+        return {'count': count, 'ratio': round(count / total, 4) if total else 0.0}
+
+    return {
+        'resumes': total,
+        'avg_word_count': round(stats.get('words', 0) / total, 1) if total else 0.0,
+        'has_contact': share(stats.get('contact', 0)),
+        'sections': {section: share(stats.get(f'section:{section}', 0)) for section in SECTIONS},
+        # How many resumes analyze_resume would give each suggestion
+        'suggestions': {message: total - stats.get(f'section:{section}', 0)
+                        for section, message in SUGGESTIONS.items()}
+    }
+
+
+def _bump(c, dimension, counts):
+    c.executemany('''INSERT INTO analytics_counts (dimension, key, count) VALUES (?, ?, ?)
+                     ON CONFLICT (dimension, key) DO UPDATE SET count = count + excluded.count''',
+                  [(dimension, key, count) for key, count in counts.items()])
+    if any(count < 0 for count in counts.values()):
+        c.executemany('DELETE FROM analytics_counts WHERE dimension = ? AND key = ? AND count <= 0',
+                      [(dimension, key) for key in counts])
+
+
+def _apply_resume(c, skills, college, degree, text, day, sign):
+    skills = sorted(set(skills or []))
+    _bump(c, SKILL, {skill: sign for skill in skills})
+    rows = [(college or '', degree or '', skill) for skill in skills]
+    c.executemany('''INSERT INTO analytics_education_skills (college, degree, skill, count) VALUES (?, ?, ?, ?)
+                     ON CONFLICT (college, degree, skill) DO UPDATE SET count = count + excluded.count''',
+                  [(*row, sign) for row in rows])
+    if sign < 0:
+        c.executemany('''DELETE FROM analytics_education_skills
+                         WHERE college = ? AND degree = ? AND skill = ? AND count <= 0''', rows)
+    if day is None:
+        day = c.execute("SELECT date('now')").fetchone()[0]
+    _bump(c, UPLOAD_DAY, {day: sign})
+    _bump(c, RESUME_STATS, {key: sign * count for key, count in _resume_stat_deltas(text_features(text or '')).items()})
+
+
+def _apply_job(c, company, location, sign):
+    _bump(c, JOB_COMPANY, {company: sign})
+    _bump(c, JOB_LOCATION, {location: sign})
+    c.execute('''INSERT INTO analytics_job_locations (company, location, count) VALUES (?, ?, ?)
+                 ON CONFLICT (company, location) DO UPDATE SET count = count + excluded.count''',
+              (company, location, sign))
+    if sign < 0:
+        c.execute('DELETE FROM analytics_job_locations WHERE company = ? AND location = ? AND count <= 0',
+                  (company, location))
+
+
+def record_resume(c, skills, college, degree, text, day=None):
+    """Fold one new resume into the aggregates; runs in the caller's insert transaction"""
+    _apply_resume(c, skills, college, degree, text, day, 1)
+
+
+def forget_resume(c, skills, college, degree, text, day):
+    """Take a deleted (or about to be replaced) resume back out of the aggregates"""
+    _apply_resume(c, skills, college, degree, text, day, -1)
+
+
+def record_job(c, company, location):
+    """Fold one new job posting into the aggregates; runs in the caller's insert transaction"""
+    _apply_job(c, company, location, 1)
+
+
+def forget_job(c, company, location):
+    _apply_job(c, company, location, -1)
+
+
+def rebuild(conn, load_text=None):
+    """Recompute every aggregate from the resumes and jobs tables in one pass over each.
+
+    load_text(conn, resume_id) returns a resume's full text, or None to fall
+    back to the raw_text preview stored in the row.
+    """
+    c = conn.cursor()
+    counts = {SKILL: Counter(), UPLOAD_DAY: Counter(), JOB_COMPANY: Counter(),
+              JOB_LOCATION: Counter(), RESUME_STATS: Counter()}
+    education_skills = Counter()
+    job_locations = Counter()
+
+    for resume_id, skills, college, degree, raw_text, day in c.execute(
+            'SELECT id, skills, college, degree, raw_text, date(uploaded_at) FROM resumes').fetchall():
+        text = load_text(conn, resume_id) if load_text else None
+        skills = sorted(set(json.loads(skills) if skills else []))
+        counts[SKILL].update(skills)
+        education_skills.update((college or '', degree or '', skill) for skill in skills)
+        counts[UPLOAD_DAY][day] += 1
+        counts[RESUME_STATS].update(_resume_stat_deltas(text_features((raw_text if text is None else text) or '')))
+
+    for company, location in c.execute('SELECT company, location FROM jobs'):
+        counts[JOB_COMPANY][company] += 1
+        counts[JOB_LOCATION][location] += 1
+        job_locations[(company, location)] += 1
+
+    c.execute('DELETE FROM analytics_counts')
+    c.execute('DELETE FROM analytics_education_skills')
+    c.execute('DELETE FROM analytics_job_locations')
+    for dimension, counter in counts.items():
+        _bump(c, dimension, counter)
+    c.executemany('INSERT INTO analytics_education_skills (college, degree, skill, count) VALUES (?, ?, ?, ?)',
+                  [(*key, count) for key, count in education_skills.items()])
+    c.executemany('INSERT INTO analytics_job_locations (company, location, count) VALUES (?, ?, ?)',
+                  [(*key, count) for key, count in job_locations.items()])
+    c.execute("INSERT OR REPLACE INTO analytics_meta (name, value) VALUES ('version', ?)", (ANALYTICS_VERSION,))
+    conn.commit()
+
+
+def ensure_built(conn, load_text=None):
+    """Backfill the aggregates once for databases created before they existed"""
+    row = conn.execute("SELECT value FROM analytics_meta WHERE name = 'version'").fetchone()
+    if row is None or row[0] != ANALYTICS_VERSION:
+        rebuild(conn, load_text)
+
+
+def top_counts(conn, dimension, limit=50):
+    rows = conn.execute('''SELECT key, count FROM analytics_counts WHERE dimension = ?
+                           ORDER BY count DESC, key LIMIT ?''', (dimension, limit)).fetchall()
+    return [{'name': key, 'count': count} for key, count in rows]
+
+
+def skills_by_education(conn, college=None, degree=None, limit=50):
+    """Top skills for one college and/or degree, or per college/degree pair when neither is given"""
+    if college is None and degree is None:
+        rows = conn.execute('''SELECT college, degree, skill, count FROM analytics_education_skills
+                               ORDER BY count DESC, skill LIMIT ?''', (limit,)).fetchall()
+    elif college is not None and degree is not None:
+        rows = conn.execute('''SELECT college, degree, skill, count FROM analytics_education_skills
+                               WHERE college = ? AND degree = ? ORDER BY count DESC, skill LIMIT ?''',
+                            (college, degree, limit)).fetchall()
+    else:
+        column, value = ('college', college) if college is not None else ('degree', degree)
+        # Summed over the other field, bounded by the number of distinct skills
+        rows = conn.execute(f'''SELECT skill, SUM(count) AS total FROM analytics_education_skills
+                                WHERE {column} = ? GROUP BY skill ORDER BY total DESC, skill LIMIT ?''',
+                            (value, limit)).fetchall()
+        return [{'college': college, 'degree': degree, 'skill': skill, 'count': count} for skill, count in rows]
+    return [{'college': r[0], 'degree': r[1], 'skill': r[2], 'count': r[3]} for r in rows]
+
+
+def uploads_per_day(conn, days=30):
+    """Upload counts for the most recent days that had uploads, oldest first"""
+    rows = conn.execute('''SELECT key, count FROM analytics_counts WHERE dimension = ?
+                           ORDER BY key DESC LIMIT ?''', (UPLOAD_DAY, days)).fetchall()
+    return [{'day': day, 'count': count} for day, count in reversed(rows)]
+
+
+def job_locations(conn, company=None, limit=50):
+    if company is None:
+        rows = conn.execute('''SELECT company, location, count FROM analytics_job_locations
+                               ORDER BY count DESC, company, location LIMIT ?''', (limit,)).fetchall()
+    else:
+        rows = conn.execute('''SELECT company, location, count FROM analytics_job_locations WHERE company = ?
+                               ORDER BY count DESC, location LIMIT ?''', (company, limit)).fetchall()
+    return [{'company': r[0], 'location': r[1], 'count': r[2]} for r in rows]
+
+
+def resume_coverage(conn):
+    """Corpus-wide section coverage from the maintained counters"""
+    rows = conn.execute('SELECT key, count FROM analytics_counts WHERE dimension = ?', (RESUME_STATS,)).fetchall()
+    return coverage_report(Counter(dict(rows)))
@@ -0,0 +1,164 @@
+import zipfile
+
+# lxml ships with python-docx; its iterparse filters tags in C
+from lxml.etree import iterparse
+
+from file_sources import open_source
+
+W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+MC_FALLBACK = '{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback'
+
+PARAGRAPH = W + 'p'
+TEXT = W + 't'
+ROW = W + 'tr'
+CELL = W + 'tc'
+# Inline elements python-docx also renders in paragraph.text
+INLINE = {W + 'tab': '\t', W + 'br': '\n', W + 'cr': '\n'}
+# Only these elements produce parser events; runs, properties and the rest never reach Python
+EVENT_TAGS = [PARAGRAPH, TEXT, ROW, CELL, MC_FALLBACK, *INLINE]
+
+CELL_SEPARATOR = '\t'
+
+
+def iter_docx_lines(source):
+    """Stream the text of a .docx body in document order.
+
+    Yields one line per paragraph and one per table row (cells joined by a tab,
+    the paragraphs of a cell by a space). word/document.xml is read with an
+    incremental parser and every element is dropped once handled, so memory
+    stays flat however long the document is. Text boxes are included once;
+    their mc:Fallback copies are skipped.
+    """
+    with open_source(source) as stream:
+        with zipfile.ZipFile(stream) as archive:
+            with archive.open('word/document.xml') as document:
+                # Open paragraphs (text boxes nest them) and open table cells
+                paragraphs = []
+                cells = []
+                rows = []
+                fallback_depth = 0
+                for event, elem in iterparse(document, events=('start', 'end'), tag=EVENT_TAGS):
+                    tag = elem.tag
+                    if event == 'start':
+                        if tag == MC_FALLBACK:
+                            fallback_depth += 1
+                        elif fallback_depth:
+                            pass
+                        elif tag == PARAGRAPH:
+                            paragraphs.append([])
+                        elif tag == ROW:
+                            rows.append([])
+                        elif tag == CELL:
+                            cells.append([])
+                        continue
+
+                    if tag == MC_FALLBACK:
+                        fallback_depth -= 1
+                    elif fallback_depth:
+                        pass
+                    elif tag == TEXT:
+                        if paragraphs and elem.text:
+                            paragraphs[-1].append(elem.text)
+                    elif tag in INLINE:
+                        if paragraphs:
+                            paragraphs[-1].append(INLINE[tag])
+                    elif tag == PARAGRAPH:
+                        text = ''.join(paragraphs.pop())
+                        if cells:
+                            if text:
+                                cells[-1].append(text)
+                        else:
+                            yield text
+                    elif tag == CELL:
+                        text = ' '.join(cells.pop())
+                        if rows:
+                            rows[-1].append(text)
+                    elif tag == ROW:
+                        line = CELL_SEPARATOR.join(rows.pop())
+                        # A nested table becomes part of its enclosing cell
+                        if cells:
+                            cells[-1].append(line)
+                        else:
+                            yield line
+                    else:
+                        continue
+                    if not paragraphs and not cells:
+                        # Top of the body again: free this element and everything before it
+                        elem.clear()
+                        parent = elem.getparent()
+                        if parent is not None:
+                            while elem.getprevious() is not None:
+                                del parent[0]
+
+
+def extract_docx_text(source):
+    """Text of a .docx, one line per paragraph or table row"""
+    return ''.join(line + '\n' for line in iter_docx_lines(source))
+
+
+if __name__ == '__main__':
+    # Benchmark against python-docx on a large, template-style resume:
+    # python docx_text.py [sections]
+    import io
+    import sys
+    import time
+    import tracemalloc
+    from docx import Document
+
+    sections = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    doc = Document()
+    doc.add_heading('Jane Doe', 0)
+    for section in range(sections):
+        doc.add_heading(f'Experience {section}', 1)
+        paragraph = doc.add_paragraph(style='List Bullet')
+        paragraph.add_run('Led ').bold = True
+        paragraph.add_run('migration of services to Kubernetes, cutting deploy time by 40%.\t')
+        paragraph.add_run('Python, Docker, AWS').italic = True
+        table = doc.add_table(rows=3, cols=3)
+        table.style = 'Table Grid'
+        for row in table.rows:
+            for index, cell in enumerate(row.cells):
+                cell.text = f'Skill {index}: SQL, React, Machine Learning'
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    data = buffer.getvalue()
+
+    def python_docx(data):
+        document = Document(io.BytesIO(data))
+        return ''.join(paragraph.text + '\n' for paragraph in document.paragraphs)
+
+    def python_docx_tables(data):
+        # The same output as the streaming extractor, via the object model
+        from docx.table import Table
+        from docx.text.paragraph import Paragraph
+        document = Document(io.BytesIO(data))
+        lines = []
+        for block in document.element.body.iterchildren():
+            if block.tag == PARAGRAPH:
+                lines.append(Paragraph(block, document).text)
+            elif block.tag == W + 'tbl':
+                for row in Table(block, document).rows:
+                    lines.append(CELL_SEPARATOR.join(' '.join(p.text for p in cell.paragraphs if p.text)
+                                                     for cell in row.cells))
+        return ''.join(line + '\n' for line in lines)
+
+    def measure(name, extract):
+        extract(data)
+        start = time.perf_counter()
+        for _ in range(5):
+            text = extract(data)
+        elapsed = (time.perf_counter() - start) / 5
+        tracemalloc.start()
+        extract(data)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f'{name:20s} {elapsed * 1000:8.1f} ms  peak {peak / 2**20:6.1f} MiB  '
+              f'{len(text):8d} chars  tables included: {"Skill 0" in text}')
+
+    print(f'{len(data) / 1024:.0f} KiB docx, {sections} sections with a 3x3 table each')
+    # Peaks are Python heap only; python-docx also holds the whole libxml2 tree
+    measure('python-docx', python_docx)
+    measure('python-docx + tables', python_docx_tables)
+    measure('streaming', extract_docx_text)
+    assert extract_docx_text(data) == python_docx_tables(data)
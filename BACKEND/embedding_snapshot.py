@@ -0,0 +1,269 @@
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import numpy as np
+
+from vector_store import SCAN_BLOCK, _file_lock
+
+MAGIC = b'RRSNAP02'
+# magic, dim, row count, watermark, offsets section offset, metadata section offset, change sequence
+HEADER = struct.Struct('<8sIQqQQq')
+HEADER_SIZE = 64
+ALIGN = 64
+
+# How often a reader checks whether a newer snapshot file has been published
+RELOAD_CHECK_SECONDS = 1.0
+
+
+def _aligned(offset):
+    return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+
+def write_snapshot(path, records, watermark, change_seq=0):
+    """Write records (id, document, metadata, embedding) to a flat snapshot file and publish it atomically.
+
+    Every inserted row up to watermark is among the records, and change_seq
+    is the last update/delete log entry applied when they were read.
+
+    Layout: header | float32 vectors [n x dim] | float32 squared norms [n] |
+    int64 record offsets [n + 1] | JSON-encoded records.
+    """
+    n = len(records)
+    dim = len(records[0]['embedding']) if n else 0
+    vectors = np.asarray([r['embedding'] for r in records], dtype=np.float32).reshape(n, dim)
+    sq_norms = np.einsum('ij,ij->i', vectors, vectors).astype(np.float32)
+
+    blobs = [json.dumps({'id': r['id'], 'document': r['document'], 'metadata': r['metadata']}).encode('utf-8')
+             for r in records]
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in blobs], out=offsets[1:])
+
+    vectors_at = HEADER_SIZE
+    norms_at = _aligned(vectors_at + vectors.nbytes)
+    offsets_at = _aligned(norms_at + sq_norms.nbytes)
+    meta_at = _aligned(offsets_at + offsets.nbytes)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, dim, n, int(watermark), offsets_at, meta_at, int(change_seq)).ljust(HEADER_SIZE, b'\0'))
+        file.write(vectors.tobytes())
+        file.seek(norms_at)
+        file.write(sq_norms.tobytes())
+        file.seek(offsets_at)
+        file.write(offsets.tobytes())
+        file.seek(meta_at)
+        for blob in blobs:
+            file.write(blob)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+
+
+class EmbeddingSnapshot:
+    """Read-only view of a snapshot file; every process mapping it shares the same page cache"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as file:
+            stat = os.fstat(file.fileno())
+            self.identity = (stat.st_ino, stat.st_mtime_ns)
+            self._mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if stat.st_size else None
+        if self._mm is None:
+            raise ValueError(f"Empty snapshot file: {path}")
+
+        magic, self.dim, self.n, self.watermark, offsets_at, self._meta_at, self.change_seq = \
+            HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Not an embedding snapshot: {path}")
+        norms_at = _aligned(HEADER_SIZE + self.n * self.dim * 4)
+        self.vectors = np.frombuffer(self._mm, dtype=np.float32, count=self.n * self.dim,
+                                     offset=HEADER_SIZE).reshape(self.n, self.dim)
+        self.sq_norms = np.frombuffer(self._mm, dtype=np.float32, count=self.n, offset=norms_at)
+        self._offsets = np.frombuffer(self._mm, dtype=np.int64, count=self.n + 1, offset=offsets_at)
+
+    def record(self, row):
+        start = self._meta_at + int(self._offsets[row])
+        end = self._meta_at + int(self._offsets[row + 1])
+        return json.loads(self._mm[start:end])
+
+    def distances(self, embedding):
+        """Squared L2 distance from the query to every row, computed block by block"""
+        query = np.asarray(embedding, dtype=np.float32)
+        out = np.empty(self.n, dtype=np.float32)
+        qq = float(query @ query)
+        for start in range(0, self.n, SCAN_BLOCK):
+            block = self.vectors[start:start + SCAN_BLOCK]
+            out[start:start + len(block)] = self.sq_norms[start:start + SCAN_BLOCK] - 2.0 * (block @ query) + qq
+        return np.maximum(out, 0.0)
+
+    def search(self, embedding, k, where=None, exclude=None):
+        """Exact top-k as (record, distance); filtered rows are skipped lazily in distance order"""
+        if self.n == 0 or k <= 0:
+            return []
+        distances = self.distances(embedding)
+        if where is None and not exclude:
+            top = np.argpartition(distances, k - 1)[:k] if self.n > k else np.arange(self.n)
+            order = top[np.argsort(distances[top], kind='stable')]
+            return [(self.record(i), float(distances[i])) for i in order]
+
+        results = []
+        for i in np.argsort(distances, kind='stable'):
+            record = self.record(i)
+            if exclude and record['id'] in exclude:
+                continue
+            if where is not None and not matches_where(record['metadata'], where):
+                continue
+            results.append((record, float(distances[i])))
+            if len(results) == k:
+                break
+        return results
+
+    def close(self):
+        self.vectors = self.sq_norms = self._offsets = None
+        try:
+            self._mm.close()
+        except BufferError:
+            # Still referenced by an in-flight query; the mapping is released once it finishes
+            pass
+
+
+class SnapshotSearcher:
+    """Serves VectorStore.query from a shared snapshot plus a small delta of newer writes.
+
+    pending_ids(watermark, change_seq) returns the ids of documents that may
+    be missing from or stale in the snapshot: rows above the watermark and
+    rows updated or deleted after it was taken. Their snapshot rows are
+    ignored; the ones still in the live store are read from it, cached, and
+    merged with the snapshot results at query time.
+
+    A replaced snapshot is never unmapped here: searches still running on it
+    hold references, and the mapping is released once the last one finishes.
+    """
+
+    def __init__(self, store, path, pending_ids):
+        self.store = store
+        self.path = path
+        self.pending_ids = pending_ids
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._checked_at = 0.0
+        self._delta_key = None
+        self._delta = ([], np.zeros((0, 0), dtype=np.float32), set())
+
+    def current(self):
+        """The newest published snapshot, re-mapped when the file has been replaced"""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._checked_at < RELOAD_CHECK_SECONDS:
+                return self._snapshot
+            self._checked_at = now
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                return self._snapshot
+            if self._snapshot is None or self._snapshot.identity != (stat.st_ino, stat.st_mtime_ns):
+                try:
+                    fresh = EmbeddingSnapshot(self.path)
+                except (OSError, ValueError) as e:
+                    print(f"Error opening snapshot {self.path}: {e}")
+                    return self._snapshot
+                self._snapshot = fresh
+            return self._snapshot
+
+    def _delta_for(self, snapshot):
+        ids = self.pending_ids(snapshot.watermark, snapshot.change_seq)
+        key = (snapshot.watermark, snapshot.change_seq, tuple(ids))
+        with self._lock:
+            if key == self._delta_key:
+                return self._delta
+        records = self.store.get(ids=list(ids), include_embeddings=True) if ids else []
+        matrix = np.asarray([r['embedding'] for r in records], dtype=np.float32)
+        with self._lock:
+            self._delta_key = key
+            self._delta = (records, matrix, set(ids))
+        return self._delta
+
+    def query(self, embedding, k, where=None):
+        snapshot = self.current()
+        if snapshot is None:
+            return self.store.query(embedding, k, where)
+
+        records, matrix, pending = self._delta_for(snapshot)
+        # A document changed after the snapshot is served from the delta only, or not at all once deleted
+        results = snapshot.search(embedding, k, where, exclude=pending)
+
+        if records:
+            query = np.asarray(embedding, dtype=np.float32)
+            diff = matrix - query
+            distances = np.einsum('ij,ij->i', diff, diff)
+            for record, distance in zip(records, distances):
+                if where is None or matches_where(record['metadata'], where):
+                    results.append((record, float(distance)))
+            results.sort(key=lambda pair: pair[1])
+        return results[:k]
+
+    def get(self, *args, **kwargs):
+        return self.store.get(*args, **kwargs)
+
+
+class SnapshotWriter:
+    """Periodically snapshots a store; a file lock keeps concurrent workers from writing at once"""
+
+    def __init__(self, store, path, watermark_of, interval=300.0, change_seq_of=None):
+        self.store = store
+        self.path = path
+        self.watermark_of = watermark_of
+        self.change_seq_of = change_seq_of
+        self.interval = interval
+        self._stop = threading.Event()
+
+    def start(self):
+        threading.Thread(target=self._run, name=f'snapshot-{os.path.basename(self.path)}', daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.write_if_stale()
+            except Exception as e:
+                print(f"Error writing snapshot {self.path}: {e}")
+            self._stop.wait(self.interval)
+
+    def write_if_stale(self):
+        """Write a new snapshot unless the published one already covers the store"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with _file_lock(f'{self.path}.lock', blocking=False) as acquired:
+            if not acquired:
+                return False
+            # Read before the records, so changes racing with the copy are replayed as delta
+            change_seq = self.change_seq_of() if self.change_seq_of else 0
+            count = self.store.count()
+            if os.path.exists(self.path):
+                with open(self.path, 'rb') as file:
+                    magic, _, n, _, _, _, published_seq = HEADER.unpack(file.read(HEADER.size))
+                if magic == MAGIC and n == count and published_seq == change_seq:
+                    return False
+            records = self.store.get(include_embeddings=True)
+            write_snapshot(self.path, records, self.watermark_of(records), change_seq)
+            return True
+
+
+def matches_where(metadata, where):
+    """Evaluate a Chroma-style equality filter ($and / $or supported) against one metadata dict"""
+    if '$and' in where:
+        return all(matches_where(metadata, clause) for clause in where['$and'])
+    if '$or' in where:
+        return any(matches_where(metadata, clause) for clause in where['$or'])
+    for key, value in where.items():
+        if isinstance(value, dict):
+            value = value.get('$eq')
+        if metadata.get(key) != value:
+            return False
+    return True
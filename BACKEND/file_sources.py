@@ -0,0 +1,66 @@
+import io
+import os
+import zipfile
+from contextlib import contextmanager
+
+PDF_MAGIC = b'%PDF-'
+ZIP_MAGIC = b'PK\x03\x04'
+OLE_MAGIC = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+
+# The PDF header may be preceded by junk bytes, but must start within the first 1 KB
+HEADER_SIZE = 1024
+
+
+@contextmanager
+def open_source(source):
+    """Yield a readable binary stream for a path, a bytes buffer or a file-like object"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        yield io.BytesIO(source)
+    elif isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as file:
+            yield file
+    else:
+        # Caller owns the stream; rewind it so every reader starts at the top
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        yield source
+
+
+def read_bytes(source):
+    """Return the full contents of a path, bytes buffer or file-like object"""
+    if isinstance(source, bytes):
+        return source
+    if isinstance(source, (bytearray, memoryview)):
+        return bytes(source)
+    with open_source(source) as stream:
+        return stream.read()
+
+
+def detect_file_type(source):
+    """Detect 'pdf', 'docx', 'doc' or 'txt' from the leading magic bytes"""
+    with open_source(source) as stream:
+        head = stream.read(HEADER_SIZE)
+        if PDF_MAGIC in head:
+            return 'pdf'
+        if head.startswith(OLE_MAGIC):
+            return 'doc'
+        if head.startswith(ZIP_MAGIC):
+            stream.seek(0)
+            try:
+                with zipfile.ZipFile(stream) as archive:
+                    if 'word/document.xml' in archive.namelist():
+                        return 'docx'
+            except zipfile.BadZipFile:
+                pass
+            # Some other zip container, e.g. an .xlsx renamed to .docx
+            return 'zip'
+    return 'txt'
+
+
+def persist_bytes(data, filepath):
+    """Write data to filepath atomically so readers never see a partial upload"""
+    tmp_path = f"{filepath}.part"
+    with open(tmp_path, 'wb') as file:
+        file.write(data)
+    os.replace(tmp_path, filepath)
+    return filepath
@@ -0,0 +1,380 @@
+"""End-to-end HTTP load test for the ResumeRAG API.
+
+Starts the Flask app in a child process against a throwaway data directory
+(SQLite database, uploads and vector store), seeds synthetic users, resumes
+and jobs through the API, then replays a weighted mix of requests at a fixed
+arrival rate and reports throughput, error rate and latency percentiles per
+route. The server gets its own interpreter, so the load generator's threads do
+not compete with it for the GIL; its output goes to server.log in the data
+directory.
+
+Everything runs locally; the embedding model must already be in the local
+Hugging Face cache (the harness forces offline mode).
+
+    python loadtest.py --rate 20 --duration 60 --mix search=4,match=3,login=1
+"""
+import argparse
+import http.cookiejar
+import json
+import logging
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_MIX = 'login=1,upload=1,search=4,match=2,match_by_id=2,get_resumes=1,get_jobs=1'
+
+# Queries per search_batch request (not in the default mix; compare it with search)
+BATCH_SIZE = 10
+
+FIRST_NAMES = ['Aarav', 'Priya', 'Rohan', 'Ananya', 'Vikram', 'Sneha', 'Arjun', 'Kavya', 'Rahul', 'Isha']
+LAST_NAMES = ['Sharma', 'Patel', 'Iyer', 'Reddy', 'Gupta', 'Nair', 'Singh', 'Das', 'Mehta', 'Rao']
+COLLEGES = ['IIT Delhi', 'NIT Trichy', 'BITS Pilani', 'IIIT Hyderabad', 'VIT Vellore']
+DEGREES = ['B.Tech', 'M.Tech', 'B.Sc', 'MCA', 'MBA']
+SKILLS = ['Python', 'Java', 'JavaScript', 'React', 'Django', 'Flask', 'SQL', 'PostgreSQL', 'MongoDB',
+          'AWS', 'Docker', 'Kubernetes', 'Git', 'Machine Learning', 'TensorFlow', 'Pandas', 'NLP', 'Agile']
+TITLES = ['Backend Engineer', 'Data Scientist', 'Frontend Developer', 'ML Engineer', 'DevOps Engineer']
+COMPANIES = ['Acme Corp', 'Globex', 'Initech', 'Umbrella', 'Hooli']
+CITIES = ['Bengaluru', 'Pune', 'Hyderabad', 'Chennai', 'Remote']
+
+
+def synthetic_resume(rng):
+    name = f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+    skills = rng.sample(SKILLS, rng.randint(3, 8))
+    years = rng.randint(0, 12)
+    text = '\n'.join([
+        name,
+        f"{name.lower().replace(' ', '.')}{rng.randint(1, 999)}@example.com",
+        f'+91 {rng.randint(70000, 99999)} {rng.randint(10000, 99999)}',
+        'Skills',
+        ', '.join(skills),
+        'Experience',
+        f'{years} years building {rng.choice(TITLES).lower()} systems with {skills[0]} and {skills[-1]}.',
+        'Education',
+        f'{rng.choice(DEGREES)} in Computer Science, {rng.choice(COLLEGES)}',
+        'Projects',
+        f'Built a {rng.choice(["search", "analytics", "payments", "chat"])} platform using {", ".join(skills[:3])}.'
+    ])
+    return text
+
+
+def synthetic_job(rng):
+    skills = rng.sample(SKILLS, rng.randint(3, 6))
+    title = rng.choice(TITLES)
+    return {
+        'title': title,
+        'company': rng.choice(COMPANIES),
+        'location': rng.choice(CITIES),
+        'description': f'We are hiring a {title} to work on {rng.choice(["search", "data", "platform"])} products.',
+        'requirements': ', '.join(skills)
+    }
+
+
+class Client:
+    """Cookie-keeping HTTP client for one synthetic user"""
+
+    def __init__(self, base_url, email, password):
+        self.base_url = base_url
+        self.email = email
+        self.password = password
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+
+    def request(self, method, path, payload=None, files=None, fields=None):
+        headers = {}
+        body = None
+        if files is not None:
+            boundary = uuid.uuid4().hex
+            body = _multipart(boundary, fields or {}, files)
+            headers['Content-Type'] = f'multipart/form-data; boundary={boundary}'
+        elif payload is not None:
+            body = json.dumps(payload).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        req = urllib.request.Request(self.base_url + path, data=body, headers=headers, method=method)
+        try:
+            with self.opener.open(req, timeout=60) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+    def login(self):
+        return self.request('POST', '/api/login', {'email': self.email, 'password': self.password})
+
+
+def _multipart(boundary, fields, files):
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode('utf-8'))
+    for name, (filename, content) in files.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                     f'Content-Type: application/octet-stream\r\n\r\n'.encode('utf-8') + content + b'\r\n')
+    parts.append(f'--{boundary}--\r\n'.encode('utf-8'))
+    return b''.join(parts)
+
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}
+
+    def record(self, route, latency, ok):
+        with self._lock:
+            self.samples.setdefault(route, []).append((latency, ok))
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(p / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def serve(port, port_file):
+    """Server side (child process): import the app and serve it, publishing the bound port"""
+    from werkzeug.serving import make_server
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import app as resumerag
+
+    # One access-log line per request would swamp the log
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', port, resumerag.app, threaded=True)
+    with open(f'{port_file}.tmp', 'w') as file:
+        file.write(str(server.server_port))
+    os.replace(f'{port_file}.tmp', port_file)
+    server.serve_forever()
+
+
+def start_server(port, data_dir, timeout=300):
+    """Run the app in a child process on the data directory; returns (process, base URL)"""
+    port_file = os.path.join(data_dir, 'server.port')
+    log_path = os.path.join(data_dir, 'server.log')
+    with open(log_path, 'wb') as log:
+        process = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--serve', '--port', str(port),
+                                    '--port-file', port_file], stdout=log, stderr=subprocess.STDOUT)
+    # Importing the app loads the embedding model, which can take a while
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(port_file):
+        if process.poll() is not None or time.monotonic() > deadline:
+            stop_server(process)
+            with open(log_path, 'rb') as log:
+                tail = log.read()[-2000:].decode('utf-8', 'replace')
+            raise RuntimeError(f'Server did not start (see {log_path}):\n{tail}')
+        time.sleep(0.2)
+    with open(port_file) as file:
+        return process, f'http://127.0.0.1:{int(file.read())}'
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def seed(base_url, rng, users, resumes, jobs):
+    clients = []
+    for i in range(users):
+        client = Client(base_url, f'loadtest{i}@example.com', 'loadtest')
+        status, body = client.request('POST', '/api/signup',
+                                      {'name': f'Load Tester {i}', 'email': client.email, 'password': client.password})
+        if status != 200:
+            raise RuntimeError(f'Signup failed ({status}): {body[:200]!r}')
+        clients.append(client)
+
+    resume_ids = []
+    for i in range(resumes):
+        client = clients[i % len(clients)]
+        status, body = client.request('POST', '/api/upload-resume',
+                                      files={'resume': (f'seed_{i}.txt', synthetic_resume(rng).encode('utf-8'))},
+                                      fields={'college': rng.choice(COLLEGES), 'degree': rng.choice(DEGREES)})
+        if status == 200:
+            resume_ids.append(json.loads(body)['resume_id'])
+
+    job_ids = []
+    for i in range(jobs):
+        status, body = clients[i % len(clients)].request('POST', '/api/add-job', synthetic_job(rng))
+        if status == 200:
+            job_ids.append(json.loads(body)['job_id'])
+    return clients, resume_ids, job_ids
+
+
+def build_actions(rng, resume_ids, job_ids):
+    """Route name -> callable(client) returning the HTTP status"""
+    def upload(client):
+        status, body = client.request('POST', '/api/upload-resume',
+                                      files={'resume': (f'load_{uuid.uuid4().hex[:8]}.txt',
+                                                        synthetic_resume(rng).encode('utf-8'))},
+                                      fields={'college': rng.choice(COLLEGES), 'degree': rng.choice(DEGREES)})
+        if status == 200:
+            resume_ids.append(json.loads(body)['resume_id'])
+        return status
+
+    def search(client):
+        job = synthetic_job(rng)
+        return client.request('POST', '/api/search-resumes',
+                              {'job_description': f"{job['description']} {job['requirements']}", 'top_k': 5})[0]
+
+    def search_batch(client):
+        queries = []
+        for _ in range(BATCH_SIZE):
+            job = synthetic_job(rng)
+            queries.append({'job_description': f"{job['description']} {job['requirements']}", 'top_k': 5})
+        return client.request('POST', '/api/search-resumes/batch', {'queries': queries})[0]
+
+    def match(client):
+        return client.request('POST', '/api/match-jobs', {'resume_text': synthetic_resume(rng)})[0]
+
+    def match_by_id(client):
+        if not resume_ids:
+            return match(client)
+        return client.request('GET', f'/api/match-jobs/{rng.choice(resume_ids)}')[0]
+
+    return {
+        'login': lambda client: client.login()[0],
+        'upload': upload,
+        'search': search,
+        'search_batch': search_batch,
+        'match': match,
+        'match_by_id': match_by_id,
+        'get_resumes': lambda client: client.request('GET', '/api/get-resumes')[0],
+        'get_jobs': lambda client: client.request('GET', '/api/get-jobs')[0]
+    }
+
+
+def parse_mix(spec, actions):
+    mix = {}
+    for part in spec.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in actions:
+            raise SystemExit(f"Unknown route '{name}' in --mix; choose from {', '.join(actions)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def run(args):
+    rng = random.Random(args.seed)
+    data_dir = tempfile.mkdtemp(prefix='resumerag-load-')
+    # Inherited by the server process
+    os.environ['RESUMERAG_DATA_DIR'] = data_dir
+    os.environ.setdefault('HF_HUB_OFFLINE', '1')
+    os.environ.setdefault('TRANSFORMERS_OFFLINE', '1')
+    server = None
+    try:
+        print(f'Data directory: {data_dir}')
+        server, base_url = start_server(args.port, data_dir)
+        print(f'Server: {base_url} (pid {server.pid})')
+
+        started = time.perf_counter()
+        clients, resume_ids, job_ids = seed(base_url, rng, args.users, args.resumes, args.jobs)
+        print(f'Seeded {len(clients)} users, {len(resume_ids)} resumes, {len(job_ids)} jobs '
+              f'in {time.perf_counter() - started:.1f}s')
+
+        actions = build_actions(rng, resume_ids, job_ids)
+        mix = parse_mix(args.mix, actions)
+        routes, weights = list(mix), list(mix.values())
+        total = int(args.rate * args.duration)
+        schedule = [(i / args.rate, rng.choices(routes, weights)[0], clients[i % len(clients)]) for i in range(total)]
+
+        recorder = Recorder()
+        begin = time.perf_counter()
+
+        def fire(offset, route, client):
+            # Latency counts from the intended send time, so client-side queueing is not hidden
+            intended = begin + offset
+            delay = intended - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            try:
+                ok = actions[route](client) < 400
+            except Exception:
+                ok = False
+            recorder.record(route, time.perf_counter() - intended, ok)
+
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            for offset, route, client in schedule:
+                pool.submit(fire, offset, route, client)
+        elapsed = time.perf_counter() - begin
+
+        report = summarize(recorder.samples, elapsed)
+        print_report(report, args.rate, elapsed)
+        if args.json:
+            with open(args.json, 'w') as file:
+                json.dump(report, file, indent=2)
+            print(f'JSON report written to {args.json}')
+    finally:
+        if server is not None:
+            stop_server(server)
+        if args.keep_data:
+            print(f'Kept data directory {data_dir}')
+        else:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+
+def summarize(samples, elapsed):
+    report = {}
+    everything = []
+    for route, values in sorted(samples.items()):
+        everything.extend(values)
+        report[route] = _stats(values, elapsed)
+    report['ALL'] = _stats(everything, elapsed)
+    return report
+
+
+def _stats(values, elapsed):
+    latencies = sorted(latency * 1000 for latency, _ in values)
+    errors = sum(1 for _, ok in values if not ok)
+    return {
+        'requests': len(values),
+        'throughput_rps': round(len(values) / elapsed, 2) if elapsed else 0.0,
+        'error_rate': round(errors / len(values), 4) if values else 0.0,
+        'p50_ms': round(percentile(latencies, 50), 1),
+        'p90_ms': round(percentile(latencies, 90), 1),
+        'p99_ms': round(percentile(latencies, 99), 1),
+        'max_ms': round(latencies[-1], 1) if latencies else 0.0
+    }
+
+
+def print_report(report, target_rate, elapsed):
+    print(f'\nTarget {target_rate:g} req/s, ran {elapsed:.1f}s')
+    print(f"{'route':<14}{'reqs':>7}{'rps':>9}{'errors':>9}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for route, s in report.items():
+        print(f"{route:<14}{s['requests']:>7}{s['throughput_rps']:>9.2f}{s['error_rate'] * 100:>8.1f}%"
+              f"{s['p50_ms']:>10.1f}{s['p90_ms']:>10.1f}{s['p99_ms']:>10.1f}{s['max_ms']:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the ResumeRAG API on a throwaway database')
+    parser.add_argument('--rate', type=float, default=10, help='target arrival rate, requests per second')
+    parser.add_argument('--duration', type=float, default=30, help='seconds to replay the mix')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f'route weights (default: {DEFAULT_MIX})')
+    parser.add_argument('--users', type=int, default=5, help='synthetic users to create')
+    parser.add_argument('--resumes', type=int, default=50, help='resumes to seed before the run')
+    parser.add_argument('--jobs', type=int, default=20, help='jobs to seed before the run')
+    parser.add_argument('--concurrency', type=int, default=64, help='client threads')
+    parser.add_argument('--port', type=int, default=0, help='server port (0 picks a free one)')
+    parser.add_argument('--seed', type=int, default=42, help='random seed for synthetic data and the mix')
+    parser.add_argument('--json', help='also write the report to this file')
+    parser.add_argument('--keep-data', action='store_true', help='keep the temporary data directory')
+    # Internal: the server process started by run()
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--port-file', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        serve(args.port, args.port_file)
+    else:
+        run(args)
+
+
+if __name__ == '__main__':
+    main()
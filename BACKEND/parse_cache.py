@@ -0,0 +1,62 @@
+import hashlib
+import json
+import os
+import threading
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class ParseCache:
+    """On-disk cache of parser output keyed by (file content hash, parser version).
+
+    Each artifact is one JSON file at <directory>/<kind>/<version>/<hash[:2]>/<hash>.json,
+    written atomically, so several processes can share the directory. Bumping a
+    version leaves the old entries unread; delete its directory to reclaim the space.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, kind, version, digest):
+        return os.path.join(self.directory, kind, version, digest[:2], f'{digest}.json')
+
+    def get(self, kind, version, digest):
+        try:
+            with open(self._path(kind, version, digest), 'rb') as file:
+                return json.loads(file.read())
+        except (OSError, ValueError):
+            return None
+
+    def put(self, kind, version, digest, value):
+        path = self._path(kind, version, digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Unique temp name: two processes may fill the same entry at once
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.part'
+        with open(tmp_path, 'wb') as file:
+            file.write(json.dumps(value).encode('utf-8'))
+        os.replace(tmp_path, path)
+
+    def fetch(self, kind, version, digest, compute):
+        """Cached artifact for digest, computing and storing it on a miss"""
+        value = self.get(kind, version, digest)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if value is None:
+            value = compute()
+            try:
+                self.put(kind, version, digest, value)
+            except OSError as e:
+                print(f"Parse cache write failed: {e}")
+        return value
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
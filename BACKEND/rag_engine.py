@@ -4,6 +4,7 @@ from langchain_community.vectorstores import Chroma
 from langchain.schema import Document
 import json
 import os
+from corpus_analytics import section_coverage
 
 class ResumeRAG:
     def __init__(self):
@@ -142,4 +143,8 @@ class ResumeRAG:
         if 'skills' not in analysis['sections_found']:
             analysis['suggestions'].append('Add a Skills section to highlight your abilities')
         
-        return analysis
\ No newline at end of file
+        return analysis
+    
+    def analyze_resumes(self, resume_texts):
+        """Section and contact coverage across many resumes, scanning each text once"""
+        return section_coverage(resume_texts)
\ No newline at end of file
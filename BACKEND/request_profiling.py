@@ -0,0 +1,159 @@
+import cProfile
+import hmac
+import json
+import os
+import pstats
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime
+from flask import g, request
+
+PROFILE_HEADER = 'X-Profile'
+# Profile browsing requests carry the token too, but are never profiled themselves
+ADMIN_PREFIX = '/api/admin/'
+
+
+class RequestProfiler:
+    """Opt-in cProfile capture of individual requests.
+
+    A request is profiled when it carries the X-Profile header with the
+    configured token, or when it is picked by sample_rate. Each profile is
+    written as a pstats file (readable by snakeviz, flameprof, gprof2dot)
+    next to a small JSON sidecar with the route, status and duration.
+    Only one request is profiled at a time; others run unprofiled.
+    """
+
+    def __init__(self, directory, token=None, sample_rate=0.0, keep=200):
+        self.directory = directory
+        self.token = token
+        self.sample_rate = sample_rate
+        self.keep = keep
+        self._busy = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def init_app(self, app):
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.teardown_request(self._cleanup)
+
+    def is_authorized(self, req):
+        supplied = req.headers.get(PROFILE_HEADER)
+        # Constant-time comparison, so response timing does not reveal how much of the token matched
+        return bool(self.token) and supplied is not None and hmac.compare_digest(
+            supplied.encode('utf-8'), self.token.encode('utf-8'))
+
+    def _wanted(self):
+        if request.path.startswith(ADMIN_PREFIX):
+            return False
+        if self.is_authorized(request):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def _start(self):
+        if not self._wanted() or not self._busy.acquire(blocking=False):
+            return
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiling tool is active in this interpreter
+            self._busy.release()
+            return
+        g._profiler = profiler
+        g._profile_started = time.perf_counter()
+
+    def _finish(self, response):
+        profiler = g.pop('_profiler', None)
+        if profiler is None:
+            return response
+        profiler.disable()
+        duration_ms = (time.perf_counter() - g.pop('_profile_started')) * 1000
+        try:
+            profile_id = self._save(profiler, response.status_code, duration_ms)
+            response.headers['X-Profile-Id'] = profile_id
+        except OSError as e:
+            print(f"Error saving profile: {e}")
+        finally:
+            self._busy.release()
+        return response
+
+    def _cleanup(self, exc):
+        # after_request does not run for unhandled exceptions
+        profiler = g.pop('_profiler', None)
+        if profiler is not None:
+            profiler.disable()
+            self._busy.release()
+
+    def _save(self, profiler, status, duration_ms):
+        route = request.url_rule.rule if request.url_rule else request.path
+        profile_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{re.sub(r'[^A-Za-z0-9]+', '-', route).strip('-') or 'root'}_{uuid.uuid4().hex[:6]}"
+        profiler.dump_stats(os.path.join(self.directory, f'{profile_id}.prof'))
+        with open(os.path.join(self.directory, f'{profile_id}.json'), 'w') as file:
+            json.dump({
+                'id': profile_id,
+                'route': route,
+                'method': request.method,
+                'path': request.path,
+                'status': status,
+                'duration_ms': round(duration_ms, 2),
+                'created_at': datetime.now().isoformat()
+            }, file)
+        self._prune()
+        return profile_id
+
+    def _prune(self):
+        profiles = self.list_profiles()
+        for profile in profiles[self.keep:]:
+            for ext in ('.prof', '.json'):
+                try:
+                    os.remove(os.path.join(self.directory, profile['id'] + ext))
+                except FileNotFoundError:
+                    pass
+
+    def list_profiles(self, route=None):
+        """Recorded profiles, newest first"""
+        profiles = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.directory, name)) as file:
+                    profile = json.load(file)
+            except (OSError, ValueError):
+                continue
+            if route is None or profile.get('route') == route:
+                profiles.append(profile)
+        profiles.sort(key=lambda p: p.get('created_at', ''), reverse=True)
+        return profiles
+
+    def profile_path(self, profile_id):
+        if not re.fullmatch(r'[A-Za-z0-9_\-]+', profile_id or ''):
+            return None
+        path = os.path.join(self.directory, f'{profile_id}.prof')
+        return path if os.path.exists(path) else None
+
+    def top_functions(self, profile_id, sort='cumulative', limit=25):
+        """Hottest functions of one profile, sorted by cumulative or own ('tottime') time"""
+        path = self.profile_path(profile_id)
+        if path is None:
+            return None
+        stats = pstats.Stats(path)
+        rows = []
+        for (filename, line, func), (primitive_calls, calls, tottime, cumtime, _) in stats.stats.items():
+            rows.append({
+                'function': f'{func} ({os.path.basename(filename)}:{line})' if line else func,
+                'file': filename,
+                'calls': calls,
+                'primitive_calls': primitive_calls,
+                'tottime_ms': round(tottime * 1000, 3),
+                'cumtime_ms': round(cumtime * 1000, 3)
+            })
+        key = 'tottime_ms' if sort == 'tottime' else 'cumtime_ms'
+        rows.sort(key=lambda row: row[key], reverse=True)
+        return {
+            'total_ms': round(stats.total_tt * 1000, 3),
+            'functions': rows[:limit]
+        }
@@ -1,25 +1,44 @@
 import PyPDF2
-from docx import Document
 import re
+from file_sources import open_source, read_bytes, detect_file_type
+from parse_cache import content_hash
+from docx_text import iter_docx_lines
+from contact_fields import extract_contacts, DEFAULT_BUDGET
 
 class ResumeParser:
-    def parse(self, filepath):
-        """Parse resume file and extract information"""
-        extension = filepath.split('.')[-1].lower()
+    # Bump whenever parse() output changes so cached results are re-derived
+    VERSION = '3'
+    
+    def __init__(self, cache=None):
+        """cache: optional ParseCache; parse results are then reused per file content"""
+        self.cache = cache
+    
+    def parse(self, source):
+        """Parse a resume path, bytes buffer or file-like object and extract information"""
+        if self.cache is None:
+            return self._parse(source)
+        data = read_bytes(source)
+        return self.cache.fetch('parser', self.VERSION, content_hash(data), lambda: self._parse(data))
+    
+    def _parse(self, source):
+        file_type = detect_file_type(source)
         
-        if extension == 'pdf':
-            text = self._parse_pdf(filepath)
-        elif extension == 'docx':
-            text = self._parse_docx(filepath)
+        if file_type == 'pdf':
+            text = self._parse_pdf(source)
+        elif file_type == 'docx':
+            text = self._parse_docx(source)
         else:
-            text = self._parse_txt(filepath)
+            text = self._parse_txt(source)
         
-        # Extract structured data
+        # Extract structured data; a cached result is kept for good, so it gets a full scan
+        contacts = extract_contacts(text, budget=None if self.cache is not None else DEFAULT_BUDGET)
         data = {
             'raw_text': text,
             'name': self._extract_name(text),
-            'email': self._extract_email(text),
-            'phone': self._extract_phone(text),
+            'email': contacts['email'],
+            'phone': contacts['phone'],
+            'linkedin': contacts['linkedin'],
+            'github': contacts['github'],
             'skills': self._extract_skills(text),
             'experience': self._extract_section(text, 'experience'),
             'education': self._extract_section(text, 'education')
@@ -27,36 +46,22 @@ class ResumeParser:
         
         return data
     
-    def _parse_pdf(self, filepath):
+    def _parse_pdf(self, source):
         """Extract text from PDF"""
         text = ""
-        with open(filepath, 'rb') as file:
+        with open_source(source) as file:
             pdf_reader = PyPDF2.PdfReader(file)
             for page in pdf_reader.pages:
                 text += page.extract_text()
         return text
     
-    def _parse_docx(self, filepath):
+    def _parse_docx(self, source):
         """Extract text from DOCX"""
-        doc = Document(filepath)
-        return '\n'.join([para.text for para in doc.paragraphs])
+        return '\n'.join(iter_docx_lines(source))
     
-    def _parse_txt(self, filepath):
+    def _parse_txt(self, source):
         """Extract text from TXT"""
-        with open(filepath, 'r', encoding='utf-8') as file:
-            return file.read()
-    
-    def _extract_email(self, text):
-        """Extract email address"""
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = re.findall(email_pattern, text)
-        return emails[0] if emails else ''
-    
-    def _extract_phone(self, text):
-        """Extract phone number"""
-        phone_pattern = r'[\+\(]?[1-9][0-9 .\-\(\)]{8,}[0-9]'
-        phones = re.findall(phone_pattern, text)
-        return phones[0] if phones else ''
+        return read_bytes(source).decode('utf-8')
     
     def _extract_name(self, text):
         """Extract name (first line typically)"""
@@ -0,0 +1,162 @@
+import numpy as np
+from datetime import datetime
+
+# Relative importance of each feature; weights are normalised so they need not sum to 1
+DEFAULT_WEIGHTS = {
+    'similarity': 0.55,
+    'skills': 0.25,
+    'completeness': 0.10,
+    'recency': 0.05,
+    'education': 0.05,
+}
+
+# Parsed profile fields counted by the completeness feature; 'contact' is an email or a phone
+PROFILE_FIELDS = ['experience', 'education', 'skills', 'contact']
+
+EDUCATION_LEVELS = [
+    ('phd', 1.0), ('doctor', 1.0),
+    ('master', 0.8), ('m.tech', 0.8), ('m.sc', 0.8), ('mba', 0.8), ('mca', 0.8),
+    ('bachelor', 0.6), ('b.tech', 0.6), ('b.sc', 0.6), ('b.e', 0.6), ('bca', 0.6),
+    ('diploma', 0.4),
+]
+
+RECENCY_HALF_LIFE_DAYS = 180
+
+
+class ResumeScorer:
+    def __init__(self, weights=None, recency_half_life_days=RECENCY_HALF_LIFE_DAYS):
+        self.weights = dict(DEFAULT_WEIGHTS)
+        if weights:
+            self.weights.update(weights)
+        self.recency_half_life_days = recency_half_life_days
+
+    def score(self, similarity, skills, profiles, uploaded_at, degrees, required_skills, weights=None, now=None):
+        """Score every candidate at once; returns (total, {feature: array}).
+
+        similarity is each candidate's cosine similarity to the query (see
+        vector_store.cosine_similarity), clipped to 0..1. profiles are the parsed
+        fields of each candidate (experience, education, email, phone); missing
+        keys count as empty.
+        """
+        features = {
+            'similarity': np.clip(np.asarray(similarity, dtype=np.float64), 0.0, 1.0),
+            'skills': self._skill_overlap(skills, required_skills),
+            'completeness': self._completeness(profiles, skills),
+            'recency': self._recency(uploaded_at, now),
+            'education': self._education(profiles, degrees),
+        }
+
+        active = dict(self.weights)
+        if weights:
+            active.update(weights)
+        if not required_skills:
+            # No requirements to overlap with; don't let the feature drag every score down
+            active['skills'] = 0.0
+
+        names = list(features)
+        matrix = np.vstack([features[name] for name in names])
+        w = np.array([max(float(active.get(name, 0.0)), 0.0) for name in names])
+        if w.sum() == 0:
+            w[names.index('similarity')] = 1.0
+        total = (w / w.sum()) @ matrix
+        return total, features
+
+    def rerank(self, matches, profiles, required_skills, top_k=None, weights=None, now=None):
+        """Reorder search matches by the combined score, keeping the raw similarity"""
+        if not matches:
+            return []
+
+        total, features = self.score(
+            [m.get('match_score', 0.0) for m in matches],
+            [m.get('skills') or [] for m in matches],
+            profiles,
+            [m.get('uploaded_at') or '' for m in matches],
+            [m.get('degree') or '' for m in matches],
+            required_skills,
+            weights=weights,
+            now=now,
+        )
+
+        order = np.argsort(-total, kind='stable')
+        if top_k is not None:
+            order = order[:top_k]
+
+        ranked = []
+        for i in order:
+            match = dict(matches[i])
+            match['similarity'] = match.get('match_score', 0.0)
+            match['match_score'] = float(total[i])
+            match['score_breakdown'] = {name: float(values[i]) for name, values in features.items()}
+            ranked.append(match)
+        return ranked
+
+    def _skill_overlap(self, skills, required_skills):
+        """Fraction of the required skills each candidate lists"""
+        n = len(skills)
+        required = np.unique(np.array([s.lower() for s in required_skills], dtype=object))
+        if n == 0 or required.size == 0:
+            return np.zeros(n)
+
+        lengths = np.fromiter((len(s) for s in skills), dtype=np.int64, count=n)
+        if lengths.sum() == 0:
+            return np.zeros(n)
+        rows = np.repeat(np.arange(n), lengths)
+        flat = np.array([skill.lower() for candidate in skills for skill in candidate], dtype=object)
+        hits = np.isin(flat, required)
+        return np.bincount(rows[hits], minlength=n) / required.size
+
+    def _completeness(self, profiles, skills):
+        """Share of PROFILE_FIELDS the parser filled in for each resume"""
+        n = len(profiles)
+        filled = (_filled(profiles, 'experience').astype(np.float64) + _filled(profiles, 'education') +
+                  (np.fromiter(map(len, skills), dtype=np.int64, count=n) > 0) +
+                  (_filled(profiles, 'email') | _filled(profiles, 'phone')))
+        return filled / len(PROFILE_FIELDS)
+
+    def _recency(self, uploaded_at, now=None):
+        """Exponential decay on resume age, 1.0 for a resume uploaded just now"""
+        stamps = _parse_timestamps(uploaded_at)
+        if stamps.size == 0:
+            return np.zeros(0)
+        now = np.datetime64(now or datetime.now(), 'us')
+        age_days = (now - stamps) / np.timedelta64(1, 'D')
+        recency = np.power(0.5, np.clip(age_days, 0.0, None) / self.recency_half_life_days)
+        return np.where(np.isnat(stamps), 0.0, recency)
+
+    def _education(self, profiles, degrees):
+        """Highest education level named in the degree field or the parsed education section"""
+        text = np.char.lower(np.char.add(np.char.add(_strings(degrees), ' '), _field(profiles, 'education')))
+        levels = np.zeros(len(profiles))
+        for keyword, level in EDUCATION_LEVELS:
+            levels = np.maximum(levels, np.where(np.char.find(text, keyword) >= 0, level, 0.0))
+        # An education section without a recognised degree still counts for something
+        return np.where((levels == 0) & _filled(profiles, 'education'), 0.2, levels)
+
+
+def _strings(values):
+    """Unicode array of values, '' for None"""
+    return np.array([value or '' for value in values], dtype=str).reshape(-1)
+
+
+def _field(profiles, key):
+    return _strings([profile.get(key) for profile in profiles])
+
+
+def _filled(profiles, key):
+    """Whether each profile has a non-empty value for key"""
+    return np.char.str_len(_field(profiles, key)) > 0
+
+
+def _parse_timestamps(values):
+    """Parse ISO / SQLite timestamps into datetime64[us], NaT where unparseable"""
+    cleaned = np.char.replace(np.asarray(values, dtype=str), ' ', 'T')
+    try:
+        return cleaned.astype('datetime64[us]')
+    except ValueError:
+        parsed = np.empty(cleaned.shape, dtype='datetime64[us]')
+        for i, value in enumerate(cleaned):
+            try:
+                parsed[i] = np.datetime64(value, 'us')
+            except ValueError:
+                parsed[i] = np.datetime64('NaT')
+        return parsed
@@ -0,0 +1,134 @@
+import threading
+import numpy as np
+
+DEFAULT_THRESHOLD = 0.3
+
+
+class SavedSearchIndex:
+    """Saved job-description queries, scored against every new resume at ingestion time"""
+
+    def __init__(self, get_db):
+        self.get_db = get_db
+        self._lock = threading.Lock()
+        self._version = None
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._sq_norms = np.zeros(0, dtype=np.float32)
+        self._thresholds = np.zeros(0, dtype=np.float32)
+
+    def create(self, name, job_description, embedding, created_by, threshold=DEFAULT_THRESHOLD):
+        """Store a query with its embedding and return the new search id"""
+        vector = np.asarray(embedding, dtype=np.float32)
+        conn = self.get_db()
+        c = conn.cursor()
+        c.execute('''INSERT INTO saved_searches (name, job_description, embedding, threshold, created_by)
+                     VALUES (?, ?, ?, ?, ?)''',
+                  (name, job_description, vector.tobytes(), float(threshold), created_by))
+        search_id = c.lastrowid
+        conn.commit()
+        conn.close()
+        return search_id
+
+    def list(self, created_by):
+        """Saved searches of one user with their unseen hit counts"""
+        conn = self.get_db()
+        c = conn.cursor()
+        c.execute('''SELECT s.id, s.name, s.job_description, s.threshold, s.created_at,
+                            (SELECT COUNT(*) FROM saved_search_hits h
+                             WHERE h.search_id = s.id AND h.seen = 0) AS unseen
+                     FROM saved_searches s WHERE s.created_by = ? ORDER BY s.created_at DESC''',
+                  (created_by,))
+        searches = [dict(row) for row in c.fetchall()]
+        conn.close()
+        return searches
+
+    def get(self, search_id, created_by):
+        conn = self.get_db()
+        c = conn.cursor()
+        c.execute('SELECT id, name, job_description, threshold, created_at FROM saved_searches WHERE id = ? AND created_by = ?',
+                  (search_id, created_by))
+        search = c.fetchone()
+        conn.close()
+        return dict(search) if search else None
+
+    def delete(self, search_id, created_by):
+        conn = self.get_db()
+        c = conn.cursor()
+        c.execute('DELETE FROM saved_searches WHERE id = ? AND created_by = ?', (search_id, created_by))
+        deleted = c.rowcount > 0
+        if deleted:
+            c.execute('DELETE FROM saved_search_hits WHERE search_id = ?', (search_id,))
+        conn.commit()
+        conn.close()
+        return deleted
+
+    def evaluate(self, resume_id, filename, embedding):
+        """Score one resume against every saved search in a single pass and record new hits.
+
+        A search that already matched this resume keeps its existing hit (and seen flag).
+        """
+        ids, matrix, sq_norms, thresholds = self._snapshot()
+        if ids.size == 0:
+            return []
+
+        vector = np.asarray(embedding, dtype=np.float32)
+        if vector.shape[0] != matrix.shape[1]:
+            return []
+
+        # Same scale as search results: 1 - squared L2 distance
+        distances = sq_norms + vector @ vector - 2.0 * (matrix @ vector)
+        scores = 1.0 - distances
+        matched = np.nonzero(scores >= thresholds)[0]
+        if matched.size == 0:
+            return []
+
+        hits = [(int(ids[i]), resume_id, filename, float(scores[i])) for i in matched]
+        conn = self.get_db()
+        c = conn.cursor()
+        c.executemany('''INSERT OR IGNORE INTO saved_search_hits (search_id, resume_id, filename, score)
+                         VALUES (?, ?, ?, ?)''', hits)
+        conn.commit()
+        conn.close()
+        return [hit[0] for hit in hits]
+
+    def hits(self, search_id, since_id=0, limit=50):
+        """Inbox of a saved search after the since_id cursor; returned hits are marked seen"""
+        conn = self.get_db()
+        c = conn.cursor()
+        c.execute('''SELECT h.id, h.resume_id, h.filename, h.score, h.matched_at, h.seen,
+                            r.name, r.email, r.college, r.degree, r.skills
+                     FROM saved_search_hits h LEFT JOIN resumes r ON r.id = h.resume_id
+                     WHERE h.search_id = ? AND h.id > ?
+                     ORDER BY h.id LIMIT ?''',
+                  (search_id, since_id, limit))
+        hits = [dict(row) for row in c.fetchall()]
+        unseen = [hit['id'] for hit in hits if not hit['seen']]
+        if unseen:
+            c.execute(f"UPDATE saved_search_hits SET seen = 1 WHERE id IN ({','.join('?' * len(unseen))})", unseen)
+            conn.commit()
+        conn.close()
+        return hits
+
+    def _snapshot(self):
+        """Return the cached query matrix, reloading it when saved searches changed (in any process)"""
+        conn = self.get_db()
+        c = conn.cursor()
+        c.execute('SELECT COUNT(*), MAX(id) FROM saved_searches')
+        version = tuple(c.fetchone())
+
+        with self._lock:
+            if version != self._version:
+                c.execute('SELECT id, embedding, threshold FROM saved_searches ORDER BY id')
+                rows = c.fetchall()
+                vectors = [np.frombuffer(row['embedding'], dtype=np.float32) for row in rows]
+                dim = max((v.shape[0] for v in vectors), default=0)
+                # Searches embedded with a different model dimension can never match
+                keep = [i for i, v in enumerate(vectors) if v.shape[0] == dim]
+                self._ids = np.array([rows[i]['id'] for i in keep], dtype=np.int64)
+                self._matrix = np.vstack([vectors[i] for i in keep]) if keep else np.zeros((0, 0), dtype=np.float32)
+                self._sq_norms = np.einsum('ij,ij->i', self._matrix, self._matrix)
+                self._thresholds = np.array([rows[i]['threshold'] for i in keep], dtype=np.float32)
+                self._version = version
+            snapshot = (self._ids, self._matrix, self._sq_norms, self._thresholds)
+        conn.close()
+        return snapshot
@@ -0,0 +1,329 @@
+import re
+import threading
+import numpy as np
+
+MAX_QUERY_TERMS = 32
+# Parsing and evaluation recurse per level of nesting; both are bounded well below the interpreter limit
+MAX_QUERY_DEPTH = 16
+MAX_QUERY_LENGTH = 2000
+_TOKEN = re.compile(r'\(|\)|"[^"]*"|[^\s()"]+')
+_KEYWORDS = {'AND', 'OR', 'NOT'}
+
+
+def normalize_skill(skill):
+    return ' '.join(str(skill).lower().split())
+
+
+def index_resume(c, resume_id, skills):
+    """Add one resume's skills to the resume_skills join table; runs in the caller's insert transaction"""
+    c.executemany('INSERT OR IGNORE INTO resume_skills (skill, resume_id) VALUES (?, ?)',
+                  [(normalize_skill(skill), resume_id) for skill in set(skills or []) if str(skill).strip()])
+
+
+def remove_resume(c, resume_id):
+    c.execute('DELETE FROM resume_skills WHERE resume_id = ?', (resume_id,))
+
+
+def backfill(conn):
+    """Index resumes stored before resume_skills existed (or written by an older version).
+
+    Only rows above the highest indexed id are scanned, so this is cheap to
+    run on every start.
+    """
+    c = conn.cursor()
+    c.execute('''INSERT OR IGNORE INTO resume_skills (skill, resume_id)
+                 SELECT lower(trim(s.value)), r.id FROM resumes r, json_each(r.skills) s
+                 WHERE r.skills IS NOT NULL AND json_valid(r.skills) AND trim(s.value) != ''
+                   AND r.id > (SELECT COALESCE(MAX(resume_id), 0) FROM resume_skills)''')
+    conn.commit()
+    return c.rowcount
+
+
+def parse_query(query):
+    """Turn a skill query into an expression tree of ('skill', name), ('and'|'or', [..]) and ('not', expr).
+
+    Accepts either a string such as 'python AND (docker OR kubernetes) AND NOT
+    java' (NOT binds tighter than AND, AND tighter than OR; multi-word skills
+    may be quoted or written plainly) or the equivalent JSON form:
+    {"and": ["python", {"or": ["docker", "kubernetes"]}, {"not": "java"}]}.
+    """
+    if isinstance(query, str) and len(query) > MAX_QUERY_LENGTH:
+        raise ValueError(f'Skill query is longer than {MAX_QUERY_LENGTH} characters')
+    tree = _parse_json(query) if not isinstance(query, str) else _Parser(query).parse()
+    if _count_terms(tree) > MAX_QUERY_TERMS:
+        raise ValueError(f'Skill query has more than {MAX_QUERY_TERMS} terms')
+    return tree
+
+
+def _parse_json(node, depth=0):
+    if depth > MAX_QUERY_DEPTH:
+        raise ValueError(f'Skill query is nested more than {MAX_QUERY_DEPTH} levels deep')
+    if isinstance(node, str):
+        skill = normalize_skill(node)
+        if not skill:
+            raise ValueError('Empty skill in query')
+        return ('skill', skill)
+    if isinstance(node, dict) and len(node) == 1:
+        op, value = next(iter(node.items()))
+        op = op.lower()
+        if op == 'not':
+            return ('not', _parse_json(value, depth + 1))
+        if op in ('and', 'or') and isinstance(value, list) and value:
+            return (op, [_parse_json(child, depth + 1) for child in value])
+    raise ValueError(f'Invalid skill query node: {node!r}')
+
+
+class _Parser:
+    def __init__(self, text):
+        self.tokens = _TOKEN.findall(text)
+        self.pos = 0
+        self.depth = 0
+
+    def _peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def _keyword(self):
+        token = self._peek()
+        return token.upper() if token is not None and token.upper() in _KEYWORDS else None
+
+    def parse(self):
+        if not self.tokens:
+            raise ValueError('Empty skill query')
+        tree = self._or()
+        if self._peek() is not None:
+            raise ValueError(f"Unexpected '{self._peek()}' in skill query")
+        return tree
+
+    def _or(self):
+        children = [self._and()]
+        while self._keyword() == 'OR':
+            self.pos += 1
+            children.append(self._and())
+        return children[0] if len(children) == 1 else ('or', children)
+
+    def _and(self):
+        children = [self._not()]
+        while self._keyword() == 'AND':
+            self.pos += 1
+            children.append(self._not())
+        return children[0] if len(children) == 1 else ('and', children)
+
+    def _descend(self):
+        self.depth += 1
+        if self.depth > MAX_QUERY_DEPTH:
+            raise ValueError(f'Skill query is nested more than {MAX_QUERY_DEPTH} levels deep')
+
+    def _not(self):
+        if self._keyword() == 'NOT':
+            self.pos += 1
+            self._descend()
+            tree = ('not', self._not())
+            self.depth -= 1
+            return tree
+        return self._atom()
+
+    def _atom(self):
+        token = self._peek()
+        if token is None:
+            raise ValueError('Skill query ends unexpectedly')
+        if token == '(':
+            self.pos += 1
+            self._descend()
+            tree = self._or()
+            if self._peek() != ')':
+                raise ValueError("Missing ')' in skill query")
+            self.pos += 1
+            self.depth -= 1
+            return tree
+        if token == ')':
+            raise ValueError("Unexpected ')' in skill query")
+        if token.startswith('"'):
+            self.pos += 1
+            words = [token.strip('"')]
+        else:
+            # Consecutive plain words form one skill, e.g. machine learning
+            words = []
+            while self._peek() not in (None, '(', ')') and not self._keyword() and not self._peek().startswith('"'):
+                words.append(self._peek())
+                self.pos += 1
+        return _parse_json(' '.join(words))
+
+
+def _count_terms(tree):
+    op, value = tree
+    if op == 'skill':
+        return 1
+    if op == 'not':
+        return _count_terms(value)
+    return sum(_count_terms(child) for child in value)
+
+
+class SkillIndex:
+    """Bitmap inverted index over resume_skills for boolean skill queries.
+
+    Each skill maps to a packed bitmap over resume ids; college and degree are
+    kept as per-id code arrays. The bitmaps are built from the database on
+    first use and, before every query, caught up with resumes inserted since
+    (ids above the last one seen) and with resumes updated or deleted since
+    (entries in the record_changes log), whichever process wrote them.
+    """
+
+    def __init__(self, get_db):
+        self.get_db = get_db
+        self._lock = threading.Lock()
+        self._max_id = 0
+        self._change_seq = 0
+        self._bytes = 0
+        self._postings = {}
+        self._alive = np.zeros(0, dtype=np.uint8)
+        self._fields = {'college': np.zeros(0, dtype=np.int32), 'degree': np.zeros(0, dtype=np.int32)}
+        self._codes = {'college': {}, 'degree': {}}
+
+    def _grow(self, max_id):
+        needed = max_id // 8 + 1
+        if needed <= self._bytes:
+            return
+        size = max(needed, self._bytes * 2, 1024)
+        pad = size - self._bytes
+        self._postings = {skill: np.concatenate([bits, np.zeros(pad, dtype=np.uint8)])
+                          for skill, bits in self._postings.items()}
+        self._alive = np.concatenate([self._alive, np.zeros(pad, dtype=np.uint8)])
+        for field, codes in self._fields.items():
+            self._fields[field] = np.concatenate([codes, np.full(pad * 8, -1, dtype=np.int32)])
+        self._bytes = size
+
+    def _code(self, field, value):
+        return self._codes[field].setdefault(value or '', len(self._codes[field]))
+
+    def _bits(self, ids):
+        bits = np.zeros(self._bytes, dtype=np.uint8)
+        ids = np.asarray(ids, dtype=np.int64)
+        np.bitwise_or.at(bits, ids >> 3, (1 << (ids & 7)).astype(np.uint8))
+        return bits
+
+    def _refresh(self):
+        conn = self.get_db()
+        try:
+            # Both are single index lookups, unlike COUNT(*)
+            max_id = conn.execute('SELECT COALESCE(MAX(id), 0) FROM resumes').fetchone()[0]
+            change_seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM record_changes WHERE table_name = 'resumes'"
+                                      ).fetchone()[0]
+            if change_seq > self._change_seq:
+                changed = [row[0] for row in conn.execute(
+                    '''SELECT DISTINCT row_id FROM record_changes
+                       WHERE table_name = 'resumes' AND seq > ? AND row_id <= ?''',
+                    (self._change_seq, self._max_id))]
+                if changed:
+                    self._forget(changed)
+                    self._load(conn, f"IN ({','.join('?' * len(changed))})", changed)
+                self._change_seq = change_seq
+            if max_id > self._max_id:
+                self._load(conn, '> ?', [self._max_id])
+                self._max_id = max_id
+        finally:
+            conn.close()
+
+    def _forget(self, ids):
+        mask = ~self._bits(ids)
+        self._alive &= mask
+        for bits in self._postings.values():
+            bits &= mask
+
+    def _load(self, conn, id_condition, params):
+        """Set the bits of the resumes whose id matches the condition ('> ?' or 'IN (...)')"""
+        rows = conn.execute(f'SELECT id, college, degree FROM resumes WHERE id {id_condition} ORDER BY id',
+                            params).fetchall()
+        if not rows:
+            return
+        ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        self._grow(int(ids[-1]))
+        self._alive |= self._bits(ids)
+        for position, field in ((1, 'college'), (2, 'degree')):
+            self._fields[field][ids] = [self._code(field, row[position]) for row in rows]
+
+        postings = {}
+        for skill, resume_id in conn.execute(f'SELECT skill, resume_id FROM resume_skills WHERE resume_id {id_condition}',
+                                             params):
+            postings.setdefault(skill, []).append(resume_id)
+        for skill, skill_ids in postings.items():
+            bits = self._postings.get(skill)
+            if bits is None:
+                bits = self._postings[skill] = np.zeros(self._bytes, dtype=np.uint8)
+            bits |= self._bits(skill_ids)
+
+    def _evaluate(self, tree):
+        op, value = tree
+        if op == 'skill':
+            bits = self._postings.get(value)
+            return bits if bits is not None else np.zeros(self._bytes, dtype=np.uint8)
+        if op == 'not':
+            return self._alive & ~self._evaluate(value)
+        parts = [self._evaluate(child) for child in value]
+        return np.bitwise_and.reduce(parts) if op == 'and' else np.bitwise_or.reduce(parts)
+
+    def search(self, query, college=None, degree=None, limit=50, offset=0):
+        """Total count and one page of resume ids (ascending) matching a boolean skill query"""
+        tree = parse_query(query)
+        with self._lock:
+            self._refresh()
+            bits = self._evaluate(tree) & self._alive
+            ids = np.flatnonzero(np.unpackbits(bits, bitorder='little'))
+            for field, value in (('college', college), ('degree', degree)):
+                if value:
+                    code = self._codes[field].get(value)
+                    ids = ids[self._fields[field][ids] == code] if code is not None else ids[:0]
+        return {'total': int(ids.size), 'ids': ids[offset:offset + limit].tolist()}
+
+
+if __name__ == '__main__':
+    # Benchmark: boolean queries over a synthetic corpus of 100k resumes
+    import json
+    import random
+    import sqlite3
+    import time
+
+    import os
+    import tempfile
+
+    n = 100_000
+    rng = random.Random(7)
+    vocabulary = [f'skill{i}' for i in range(60)] + ['python', 'docker', 'java', 'kubernetes', 'machine learning']
+    weights = [1.0] * 60 + [8.0, 5.0, 6.0, 3.0, 4.0]
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE resumes (id INTEGER PRIMARY KEY, college TEXT, degree TEXT, skills TEXT)')
+    conn.execute('''CREATE TABLE resume_skills (skill TEXT NOT NULL, resume_id INTEGER NOT NULL,
+                    PRIMARY KEY (skill, resume_id)) WITHOUT ROWID''')
+    conn.execute('CREATE INDEX idx_resume_skills_resume ON resume_skills (resume_id)')
+    conn.executemany('INSERT INTO resumes VALUES (?, ?, ?, ?)',
+                     [(i, f'college{rng.randrange(50)}', rng.choice(['B.Tech', 'M.Tech', 'MCA']),
+                       json.dumps(sorted(set(rng.choices(vocabulary, weights, k=rng.randint(3, 10))))))
+                      for i in range(1, n + 1)])
+    conn.execute('CREATE TABLE record_changes (seq INTEGER PRIMARY KEY AUTOINCREMENT, table_name TEXT, row_id INTEGER)')
+    conn.commit()
+    started = time.perf_counter()
+    backfill(conn)
+    print(f'backfill of {n} resumes: {time.perf_counter() - started:.2f}s, '
+          f'{conn.execute("SELECT COUNT(*) FROM resume_skills").fetchone()[0]} postings')
+    conn.close()
+
+    index = SkillIndex(lambda: sqlite3.connect(path))
+    started = time.perf_counter()
+    index.search('python')
+    print(f'initial bitmap load: {time.perf_counter() - started:.2f}s')
+
+    queries = [
+        ('python AND docker', None),
+        ('python AND docker', 'college7'),
+        ('python AND (docker OR kubernetes) AND NOT java', None),
+        ('"machine learning" OR skill3 OR skill4', None),
+        ('NOT python', None),
+        ({'and': ['python', 'docker', 'kubernetes', {'not': 'java'}]}, 'college7'),
+    ]
+    for query, college in queries:
+        runs = 20
+        started = time.perf_counter()
+        for _ in range(runs):
+            result = index.search(query, college, limit=50)
+        elapsed = (time.perf_counter() - started) / runs * 1000
+        print(f'{json.dumps(query):<60} college={college or "-":<9} total={result["total"]:>6}  {elapsed:6.2f} ms')
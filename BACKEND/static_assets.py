@@ -0,0 +1,108 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Fingerprinted URLs never change content, so clients may keep them for a year
+IMMUTABLE = 'public, max-age=31536000, immutable'
+# The page and unversioned URLs are revalidated on every use (a 304 when unchanged)
+REVALIDATE = 'no-cache'
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 256
+
+
+class Asset:
+    """One file held in memory with its precompressed bodies and strong ETags"""
+
+    def __init__(self, name, body):
+        self.name = name
+        self.mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        self.digest = hashlib.sha256(body).hexdigest()[:16]
+        stem, ext = os.path.splitext(name)
+        self.fingerprinted_name = f'{stem}.{self.digest}{ext}'
+        # encoding -> (body, etag); a strong ETag must differ per representation
+        self.variants = {'identity': (body, f'"{self.digest}"')}
+        if len(body) >= MIN_COMPRESS_SIZE:
+            compressed = gzip.compress(body, compresslevel=9, mtime=0)
+            if len(compressed) < len(body):
+                self.variants['gzip'] = (compressed, f'"{self.digest}-gz"')
+            if brotli is not None:
+                compressed = brotli.compress(body, quality=11)
+                if len(compressed) < len(body):
+                    self.variants['br'] = (compressed, f'"{self.digest}-br"')
+
+
+class StaticAssets:
+    """Frontend files loaded once, fingerprinted and precompressed.
+
+    The page references the fingerprinted names of the other assets (e.g.
+    style.<hash>.css), which are served as immutable; the page itself and the
+    plain names are served for revalidation. Files are read at startup, so
+    edits need a restart.
+    """
+
+    def __init__(self, directory, names, page='index.html'):
+        self.directory = directory
+        self.page = page
+        self.assets = {}
+        for name in names:
+            if name != page:
+                with open(os.path.join(directory, name), 'rb') as file:
+                    self.assets[name] = Asset(name, file.read())
+
+        with open(os.path.join(directory, page), 'rb') as file:
+            html = file.read().decode('utf-8')
+        for asset in list(self.assets.values()):
+            html = re.sub(rf'''((?:href|src)=["']){re.escape(asset.name)}(["'])''',
+                          rf'\g<1>{asset.fingerprinted_name}\g<2>', html)
+        self.assets[page] = Asset(page, html.encode('utf-8'))
+
+        # Plain names stay servable (stale pages may link them) but are revalidated
+        self._routes = {page: (self.assets[page], REVALIDATE)}
+        for name, asset in self.assets.items():
+            if name != page:
+                self._routes[name] = (asset, REVALIDATE)
+                self._routes[asset.fingerprinted_name] = (asset, IMMUTABLE)
+
+    def __contains__(self, path):
+        return path in self._routes
+
+    def response(self, path, request, response_class):
+        """Response for a served path, honouring Accept-Encoding and If-None-Match"""
+        asset, cache_control = self._routes[path]
+        encoding = 'identity'
+        for candidate in ('br', 'gzip'):
+            if candidate in asset.variants and request.accept_encodings.quality(candidate) > 0:
+                encoding = candidate
+                break
+        body, etag = asset.variants[encoding]
+
+        if request.if_none_match.contains_weak(etag.strip('"')):
+            response = response_class(status=304)
+        else:
+            response = response_class(body, mimetype=asset.mimetype)
+            if encoding != 'identity':
+                response.headers['Content-Encoding'] = encoding
+        response.headers['ETag'] = etag
+        response.headers['Cache-Control'] = cache_control
+        if len(asset.variants) > 1:
+            response.headers['Vary'] = 'Accept-Encoding'
+        return response
+
+
+if __name__ == '__main__':
+    # Sizes of the precompressed frontend: python static_assets.py [frontend dir]
+    import sys
+
+    directory = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'FRONTEND')
+    assets = StaticAssets(directory, ['index.html', 'script.js', 'style.css'])
+    for asset in assets.assets.values():
+        sizes = ', '.join(f'{encoding} {len(body)}' for encoding, (body, _) in asset.variants.items())
+        print(f'{asset.fingerprinted_name:32s} {sizes}')
@@ -0,0 +1,69 @@
+import random
+import time
+
+import pytest
+
+from contact_fields import FIELDS, extract_contacts
+
+SAMPLES = {
+    'Jane Doe\njane.doe@mail.example.co.in | +91 98765 43210\nlinkedin.com/in/jane-doe github.com/janedoe':
+        ('jane.doe@mail.example.co.in', '+91 98765 43210', 'linkedin.com/in/jane-doe', 'github.com/janedoe'),
+    'Call (555) 123-4567 or mail x@y.io; https://www.LinkedIn.com/in/x_y':
+        ('x@y.io', '(555) 123-4567', 'LinkedIn.com/in/x_y', ''),
+    'Phone: 9876543210, ID 12345678901234567': ('', '9876543210', '', ''),
+    'London office: +44 20 7946 0958': ('', '+44 20 7946 0958', '', ''),
+    'Mobile +61 412 345 678 (AU)': ('', '+61 412 345 678', '', ''),
+    'Tel. 098765 43210': ('', '098765 43210', '', ''),
+    'Worked 2015 2019 at pin 560001; ID 12345678901234567': ('', '', '', ''),
+}
+
+# Inputs built to make backtracking patterns go quadratic or worse
+GENERATORS = {
+    'dotted words': lambda n: 'a.' * (n // 2),
+    'at-signs': lambda n: 'a@a' * (n // 3),
+    'digit runs': lambda n: '1 ' * (n // 2) + 'x',
+    'domain-like': lambda n: 'a@' + 'b-' * (n // 2),
+    'phone groups': lambda n: '+12 (345) 6-7.8 1234567890123456 ' * (n // 33),
+    'random symbols': lambda n: ''.join(random.Random(3).choice('a1.@-+( )/:\n') for _ in range(n)),
+}
+
+
+def timed(text, budget):
+    start = time.perf_counter()
+    extract_contacts(text, budget=budget)
+    return time.perf_counter() - start
+
+
+@pytest.mark.parametrize('text, expected', SAMPLES.items())
+def test_extracts_first_of_each_field(text, expected):
+    result = extract_contacts(text)
+    assert tuple(result[field] for field in FIELDS) == expected
+
+
+def test_match_across_chunk_boundary():
+    # Starts just before the end of the first 64 KB chunk
+    text = 'x ' * 32766 + ' jane.doe@example.com'
+    assert extract_contacts(text, budget=None)['email'] == 'jane.doe@example.com'
+
+
+def test_longest_email_across_chunk_boundary():
+    # 64-character local part and nine 63-character labels: 665 characters, straddling 64 KB
+    email = 'j' * 64 + '@' + '.'.join(['d' * 63] * 9) + '.' + 'c' * 24
+    for start in (65530 - len(email) // 2, 65530):
+        text = 'x' * (start - 1) + ' ' + email + ' '
+        assert extract_contacts(text, budget=None)['email'] == email
+
+
+@pytest.mark.parametrize('name', GENERATORS)
+def test_scan_is_linear(name):
+    generate = GENERATORS[name]
+    small, large = generate(100_000), generate(400_000)
+    # No budget: a truncated scan would hide a quadratic one
+    small_time = min(timed(small, budget=None) for _ in range(3))
+    large_time = min(timed(large, budget=None) for _ in range(3))
+    # 4x the input; a quadratic scan would take 16x
+    assert large_time < small_time * 8, f'{small_time:.4f}s -> {large_time:.4f}s'
+
+
+def test_budget_bounds_a_huge_document():
+    assert timed('a.' * 5_000_000, budget=0.01) < 0.5
@@ -0,0 +1,48 @@
+import numpy as np
+
+from resume_scoring import ResumeScorer
+from vector_store import cosine_similarity
+
+
+def candidates(cosines):
+    """Unit vectors at the given cosines to a unit query, and their squared L2 distances to it"""
+    rng = np.random.default_rng(5)
+    query = rng.normal(size=384)
+    query /= np.linalg.norm(query)
+    distances = []
+    for cosine in cosines:
+        other = rng.normal(size=384)
+        other -= (other @ query) * query
+        vector = cosine * query + np.sqrt(1 - cosine ** 2) * other / np.linalg.norm(other)
+        distances.append(float(np.sum((vector - query) ** 2)))
+    return distances
+
+
+def test_similarity_orders_real_scale_distances():
+    # MiniLM cosines between a job and resumes mostly fall here: squared L2 of 1.1 to 1.7
+    cosines = [0.15, 0.42, 0.3, 0.22, 0.36]
+    distances = candidates(cosines)
+    assert all(1.0 < d < 2.0 for d in distances)
+    matches = [{'resume_id': i, 'skills': ['Python'], 'uploaded_at': '2024-01-01 00:00:00',
+                'match_score': cosine_similarity(d)} for i, d in enumerate(distances)]
+    profiles = [{'experience': 'Dev', 'education': 'B.Tech'} for _ in matches]
+
+    ranked = ResumeScorer().rerank(matches, profiles, ['python'])
+
+    assert [m['resume_id'] for m in ranked] == list(np.argsort(cosines)[::-1])
+    similarities = [m['score_breakdown']['similarity'] for m in ranked]
+    np.testing.assert_allclose(similarities, sorted(cosines, reverse=True))
+
+
+def test_features_break_similarity_ties():
+    distance = candidates([0.3])[0]
+    matches = [{'resume_id': i, 'skills': skills, 'match_score': cosine_similarity(distance)}
+               for i, skills in enumerate([['Java'], ['Python', 'SQL']])]
+    profiles = [{'education': 'Diploma'}, {'experience': 'Dev', 'education': 'M.Tech', 'email': 'a@b.co'}]
+
+    ranked = ResumeScorer().rerank(matches, profiles, ['python', 'sql'])
+
+    assert [m['resume_id'] for m in ranked] == [1, 0]
+    assert ranked[0]['score_breakdown']['education'] == 0.8
+    assert ranked[0]['score_breakdown']['completeness'] == 1.0
+    assert ranked[1]['score_breakdown']['completeness'] == 0.5
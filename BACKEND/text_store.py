@@ -0,0 +1,277 @@
+import re
+import threading
+import zlib
+from collections import Counter
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# A dictionary is trained once this many texts are stored, from at most TRAIN_MAX_SAMPLES of them
+TRAIN_MIN_SAMPLES = 32
+TRAIN_MAX_SAMPLES = 2000
+# Rows rewritten per transaction when recompressing with a new dictionary
+RECOMPRESS_BATCH = 200
+# zlib can only reference its 32 KB window, so a larger preset dictionary is wasted
+ZLIB_DICT_SIZE = 32 * 1024
+ZSTD_DICT_SIZE = 64 * 1024
+ZLIB_LEVEL = 9
+ZSTD_LEVEL = 12
+
+# Dictionary fragments: whole short lines (headings, boilerplate) and words with their separator
+_LINE = re.compile(r'[^\n]{4,64}\n')
+_WORD = re.compile(r'\S{4,32}\s')
+
+
+def default_codec():
+    return 'zstd' if zstandard is not None else 'zlib'
+
+
+def _train_zlib(samples, size):
+    """Preset dictionary of the fragments shared by the most samples, weighted by length.
+
+    The most valuable fragments go last: deflate reaches the end of the
+    dictionary with the shortest back-references.
+    """
+    counts = Counter()
+    for text in samples:
+        counts.update(set(_LINE.findall(text)))
+        counts.update(set(_WORD.findall(text)))
+    scored = sorted(((df - 1) * len(fragment), fragment) for fragment, df in counts.items() if df > 1)
+    chosen = []
+    total = 0
+    for _, fragment in reversed(scored):
+        encoded = fragment.encode('utf-8')
+        if total + len(encoded) > size:
+            continue
+        chosen.append(encoded)
+        total += len(encoded)
+    return b''.join(reversed(chosen))
+
+
+def train_dictionary(codec, samples):
+    samples = [text for text in samples if text]
+    if codec == 'zstd':
+        return zstandard.train_dictionary(ZSTD_DICT_SIZE, [text.encode('utf-8') for text in samples]).as_bytes()
+    return _train_zlib(samples, ZLIB_DICT_SIZE)
+
+
+def compress(codec, data, dictionary=None):
+    if codec == 'zstd':
+        dict_data = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL, dict_data=dict_data).compress(data)
+    # Raw deflate: the codec is recorded per row, so the zlib header adds nothing
+    if dictionary:
+        compressor = zlib.compressobj(ZLIB_LEVEL, zlib.DEFLATED, -15, 9, zlib.Z_DEFAULT_STRATEGY, dictionary)
+    else:
+        compressor = zlib.compressobj(ZLIB_LEVEL, zlib.DEFLATED, -15, 9)
+    return compressor.compress(data) + compressor.flush()
+
+
+def decompress(codec, data, dictionary=None):
+    if codec == 'zstd':
+        dict_data = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+        return zstandard.ZstdDecompressor(dict_data=dict_data).decompress(data)
+    if dictionary:
+        decompressor = zlib.decompressobj(-15, dictionary)
+    else:
+        decompressor = zlib.decompressobj(-15)
+    return decompressor.decompress(data) + decompressor.flush()
+
+
+class TextStore:
+    """Full resume texts, compressed with a dictionary trained on the corpus.
+
+    Texts live in resume_texts (resume_id, dictionary_id, codec, size, data),
+    away from the resumes table, and are only decompressed when read. Each row
+    records its codec and dictionary, so rows written before a dictionary was
+    trained, or with the other codec, stay readable. Training happens off the
+    request path (DictionaryTrainer); until then texts are stored without one.
+    """
+
+    def __init__(self, codec=None):
+        self.codec = codec or default_codec()
+        self._lock = threading.Lock()
+        # Dictionaries never change once written
+        self._dictionaries = {}
+
+    def _dictionary(self, conn, dictionary_id):
+        if dictionary_id is None:
+            return None
+        with self._lock:
+            dictionary = self._dictionaries.get(dictionary_id)
+        if dictionary is None:
+            dictionary = conn.execute('SELECT data FROM text_dictionaries WHERE id = ?', (dictionary_id,)).fetchone()[0]
+            with self._lock:
+                self._dictionaries[dictionary_id] = dictionary
+        return dictionary
+
+    def _latest_dictionary(self, conn):
+        row = conn.execute('SELECT id FROM text_dictionaries WHERE codec = ? ORDER BY id DESC LIMIT 1',
+                           (self.codec,)).fetchone()
+        return row[0] if row else None
+
+    def store(self, c, resume_id, text):
+        """Write (or replace) a resume's full text in the caller's transaction"""
+        dictionary_id = self._latest_dictionary(c)
+        data = (text or '').encode('utf-8')
+        c.execute('''INSERT OR REPLACE INTO resume_texts (resume_id, dictionary_id, codec, size, data)
+                     VALUES (?, ?, ?, ?, ?)''',
+                  (resume_id, dictionary_id, self.codec, len(data),
+                   compress(self.codec, data, self._dictionary(c, dictionary_id))))
+
+    def load(self, conn, resume_id):
+        """Full text of one resume, or None if it was stored before full texts were kept"""
+        row = conn.execute('SELECT dictionary_id, codec, data FROM resume_texts WHERE resume_id = ?',
+                           (resume_id,)).fetchone()
+        if row is None:
+            return None
+        dictionary_id, codec, data = row
+        return decompress(codec, data, self._dictionary(conn, dictionary_id)).decode('utf-8')
+
+    def delete(self, c, resume_id):
+        c.execute('DELETE FROM resume_texts WHERE resume_id = ?', (resume_id,))
+
+    def train(self, c):
+        """Train a new dictionary on a sample of the stored texts; later writes use it"""
+        samples = [self.load(c, row[0]) for row in c.execute(
+            'SELECT resume_id FROM resume_texts ORDER BY random() LIMIT ?', (TRAIN_MAX_SAMPLES,)).fetchall()]
+        dictionary = train_dictionary(self.codec, samples)
+        if not dictionary:
+            raise ValueError(f"no content shared by the {len(samples)} samples")
+        return c.execute('INSERT INTO text_dictionaries (codec, data, samples) VALUES (?, ?, ?)',
+                         (self.codec, dictionary, len(samples))).lastrowid
+
+    def recompress(self, c, limit=-1):
+        """Rewrite (up to limit of) the rows not yet compressed with the latest dictionary"""
+        dictionary_id = self._latest_dictionary(c)
+        stale = c.execute('''SELECT resume_id FROM resume_texts
+                             WHERE codec != ? OR dictionary_id IS NOT ? LIMIT ?''',
+                          (self.codec, dictionary_id, limit)).fetchall()
+        for (resume_id,) in stale:
+            self.store(c, resume_id, self.load(c, resume_id))
+        return len(stale)
+
+    def train_if_needed(self, conn):
+        """Train the first dictionary once enough texts are stored, then recompress in batches.
+
+        Returns whether a dictionary was trained. A failed training (zstd
+        rejects some sample sets) leaves texts stored without a dictionary;
+        rows an interrupted recompression left behind are rewritten on the
+        next call.
+        """
+        trained = False
+        if self._latest_dictionary(conn) is None:
+            if conn.execute('SELECT COUNT(*) FROM resume_texts').fetchone()[0] < TRAIN_MIN_SAMPLES:
+                return False
+            try:
+                self.train(conn)
+            except Exception as e:
+                conn.rollback()
+                print(f"Error training text dictionary: {e}")
+                return False
+            conn.commit()
+            trained = True
+        while True:
+            # Write-locked before reading, so a concurrent update of a text is not overwritten
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                rewritten = self.recompress(conn, RECOMPRESS_BATCH)
+            except Exception:
+                conn.rollback()
+                raise
+            conn.commit()
+            if rewritten < RECOMPRESS_BATCH:
+                return trained
+
+    def report(self, conn):
+        """Stored size of the full texts against plain UTF-8"""
+        texts, plain, stored = conn.execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(length(data)), 0) FROM resume_texts').fetchone()
+        dictionaries = conn.execute(
+            'SELECT COUNT(*), COALESCE(SUM(length(data)), 0) FROM text_dictionaries').fetchone()
+        total = stored + dictionaries[1]
+        return {
+            'codec': self.codec,
+            'texts': texts,
+            'plain_bytes': plain,
+            'compressed_bytes': stored,
+            'dictionaries': dictionaries[0],
+            'dictionary_bytes': dictionaries[1],
+            'ratio': round(plain / total, 2) if total else 0.0,
+            'saved_bytes': plain - total
+        }
+
+
+class DictionaryTrainer:
+    """Background job training the text dictionary and recompressing, outside any request"""
+
+    def __init__(self, store, connect, interval=60.0):
+        self.store = store
+        self.connect = connect
+        self.interval = interval
+        self._stop = threading.Event()
+
+    def start(self):
+        threading.Thread(target=self._run, name='text-dictionary', daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            conn = self.connect()
+            try:
+                self.store.train_if_needed(conn)
+            except Exception as e:
+                # Retried on the next run; a dead thread would never train again
+                print(f"Error recompressing resume texts: {e}")
+            finally:
+                conn.close()
+
+
+if __name__ == '__main__':
+    # Compression of a synthetic resume corpus: python text_store.py [resumes]
+    import random
+    import sys
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    rng = random.Random(7)
+    skills = ['Python', 'Java', 'SQL', 'React', 'Docker', 'Kubernetes', 'AWS', 'Machine Learning',
+              'Data Analysis', 'Node.js', 'Tableau', 'Excel', 'Git', 'Agile', 'MongoDB', 'PostgreSQL']
+    verbs = ['Developed', 'Led', 'Designed', 'Implemented', 'Maintained', 'Optimized', 'Built', 'Migrated']
+    objects = ['a REST API for internal tools', 'the data pipeline', 'CI/CD workflows', 'dashboards for sales',
+               'microservices on Kubernetes', 'a recommendation engine', 'unit and integration tests']
+    words = ['team', 'customers', 'latency', 'reliability', 'reporting', 'stakeholders', 'quarterly', 'platform']
+
+    def resume(index):
+        lines = [f'Candidate {index:05d}', f'candidate{index}@example.com | +91 98{index:08d}', '',
+                 'PROFESSIONAL SUMMARY',
+                 ' '.join(rng.choice(words) for _ in range(30)), '', 'EXPERIENCE']
+        for job in range(rng.randint(2, 4)):
+            lines.append(f'Software Engineer, Company {rng.randint(1, 300)}  ({2015 + job} - {2016 + job})')
+            lines += [f'- {rng.choice(verbs)} {rng.choice(objects)}, improving {rng.choice(words)} '
+                      f'by {rng.randint(5, 60)}%' for _ in range(rng.randint(3, 6))]
+        lines += ['', 'EDUCATION', f'B.Tech in Computer Science, College {rng.randint(1, 80)}, {rng.randint(2010, 2022)}',
+                  '', 'SKILLS', ', '.join(rng.sample(skills, rng.randint(4, 10)))]
+        return '\n'.join(lines)
+
+    corpus = [resume(index) for index in range(count)]
+    # Measured on resumes the dictionary was not trained on
+    train, test = corpus[:count // 2], corpus[count // 2:]
+    plain = sum(len(text.encode('utf-8')) for text in test)
+    print(f'{len(test)} resumes, {plain / 1024:.0f} KiB plain, avg {plain // len(test)} bytes')
+    for codec in ['zlib', 'zstd']:
+        if codec == 'zstd' and zstandard is None:
+            print('zstd: zstandard not installed')
+            continue
+        bare = sum(len(compress(codec, text.encode('utf-8'))) for text in test)
+        dictionary = train_dictionary(codec, train)
+        with_dict = sum(len(compress(codec, text.encode('utf-8'), dictionary)) for text in test)
+        assert all(decompress(codec, compress(codec, text.encode('utf-8'), dictionary), dictionary)
+                   == text.encode('utf-8') for text in test[:50])
+        print(f'{codec}: no dictionary {plain / bare:4.1f}x, '
+              f'{len(dictionary) // 1024} KiB dictionary {plain / (with_dict + len(dictionary)):4.1f}x '
+              f'({(with_dict + len(dictionary)) / 1024:.0f} KiB stored)')
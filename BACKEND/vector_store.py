@@ -0,0 +1,956 @@
+import atexit
+import copy
+import heapq
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+# Rows scanned per block by exact (brute-force) search over the memory-mapped vectors
+SCAN_BLOCK = 65536
+
+
+class VectorStore:
+    """Collection of embedded documents used by ResumeRAG.
+
+    Records are dicts with 'id', 'document', 'metadata' and, when requested,
+    'embedding'. Distances are squared L2, so 1 - distance is the match score
+    for normalised embeddings; that runs from -3 to 1, so features that need a
+    bounded similarity use cosine_similarity instead.
+    """
+
+    def add(self, ids, embeddings, documents, metadatas):
+        raise NotImplementedError
+
+    def get(self, ids=None, where=None, limit=None, include_embeddings=False):
+        raise NotImplementedError
+
+    def query(self, embedding, k, where=None):
+        """Return up to k (record, distance) pairs, nearest first"""
+        raise NotImplementedError
+
+    def delete(self, ids):
+        """Remove documents by id; returns how many existed"""
+        raise NotImplementedError
+
+    def count(self):
+        """Number of live documents"""
+        raise NotImplementedError
+
+    def tombstone_count(self):
+        """Deleted documents whose space has not been reclaimed by compact() yet"""
+        return 0
+
+    def compact(self):
+        """Rebuild without tombstoned documents; returns whether anything was done"""
+        return False
+
+    def parts(self):
+        """The individually compactable stores making up this one"""
+        return [self]
+
+    def persist(self):
+        pass
+
+
+class ChromaVectorStore(VectorStore):
+    """VectorStore backed by a persistent Chroma collection"""
+
+    def __init__(self, collection_name, embedding_function, persist_directory):
+        from langchain_community.vectorstores import Chroma
+
+        self.db = Chroma(
+            collection_name=collection_name,
+            embedding_function=embedding_function,
+            persist_directory=persist_directory
+        )
+        self.collection = self.db._collection
+
+    def add(self, ids, embeddings, documents, metadatas):
+        self.collection.add(ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas)
+
+    def get(self, ids=None, where=None, limit=None, include_embeddings=False):
+        include = ['documents', 'metadatas'] + (['embeddings'] if include_embeddings else [])
+        result = self.collection.get(ids=ids, where=where, limit=limit, include=include)
+        records = []
+        for i, doc_id in enumerate(result['ids']):
+            record = {
+                'id': doc_id,
+                'document': result['documents'][i],
+                'metadata': result['metadatas'][i] or {}
+            }
+            if include_embeddings:
+                record['embedding'] = list(result['embeddings'][i])
+            records.append(record)
+        return records
+
+    def query(self, embedding, k, where=None):
+        if k <= 0 or self.count() == 0:
+            return []
+        result = self.collection.query(
+            query_embeddings=[list(embedding)],
+            n_results=k,
+            where=where,
+            include=['documents', 'metadatas', 'distances']
+        )
+        return [
+            ({'id': doc_id, 'document': document, 'metadata': metadata or {}}, float(distance))
+            for doc_id, document, metadata, distance in zip(
+                result['ids'][0], result['documents'][0], result['metadatas'][0], result['distances'][0])
+        ]
+
+    def delete(self, ids):
+        # Chroma masks deleted ids in its own HNSW index
+        existing = self.collection.get(ids=list(ids), include=[])['ids'] if ids else []
+        if existing:
+            self.collection.delete(ids=existing)
+        return len(existing)
+
+    def count(self):
+        return self.collection.count()
+
+    def persist(self):
+        self.db.persist()
+
+
+class HNSWVectorStore(VectorStore):
+    """In-process HNSW collection with memory-mapped vector storage.
+
+    Files in the collection directory:
+      <name>.vectors  raw float32 rows, indexed by label, opened with np.memmap
+      <name>.sqlite   label -> id, document and metadata
+      <name>.hnsw     hnswlib graph, saved periodically
+
+    Opening only maps the vector file and the SQLite catalogue. The graph is
+    loaded in a background thread; until it is ready queries are answered
+    exactly by scanning the mapped vectors. Vectors added after the last graph
+    save are replayed from the vector file, so the graph never has to be
+    written on every insert.
+
+    Several processes may open the same collection. Writers serialise on
+    <name>.lock and first catch up with what others committed, so every add
+    appends at the committed size; readers catch up before each query.
+    Graph searches run outside the store lock: hnswlib answers queries
+    concurrently with add_items and mark_deleted, and a graph that has to
+    grow is replaced by a resized copy rather than resized under a search.
+
+    Deletes are tombstones: the catalogue row is dropped and the label is
+    masked in the graph, leaving the vector in place. compact() rewrites the
+    vectors and graph as a new generation (<name>.g<N>.vectors / .hnsw) that
+    is switched to atomically through the catalogue.
+    """
+
+    def __init__(self, directory, name, M=16, ef_construction=200, ef_search=64,
+                 graph_save_every=1000, graph_save_interval=60.0, load_graph=True):
+        if hnswlib is None:
+            raise ImportError("HNSWVectorStore requires hnswlib (pip install hnswlib)")
+
+        os.makedirs(directory, exist_ok=True)
+        self.M = M
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.graph_save_every = graph_save_every
+        self.graph_save_interval = graph_save_interval
+
+        self.directory = directory
+        self.name = name
+        self.catalog_path = os.path.join(directory, f'{name}.sqlite')
+        self.lock_path = os.path.join(directory, f'{name}.lock')
+        self.compact_lock_path = os.path.join(directory, f'{name}.compact.lock')
+
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._init_catalog()
+
+        self.generation = self._get_meta('generation', int) or 0
+        self.vectors_path, self.graph_path = self._paths(self.generation)
+        self.dim = self._get_meta('dim', int)
+        self._tombstones = {row['label'] for row in self._db().execute('SELECT label FROM tombstones')}
+        self._vectors = None
+        self._size = 0
+        self._map_vectors()
+
+        self._index = None
+        self._index_ready = threading.Event()
+        self._unsaved = 0
+        self._last_save = time.monotonic()
+        if load_graph:
+            threading.Thread(target=self._load_graph, name=f'hnsw-load-{name}', daemon=True).start()
+        atexit.register(self.save_graph)
+
+    # -- catalogue --------------------------------------------------------
+
+    def _db(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.catalog_path)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def _init_catalog(self):
+        conn = self._db()
+        conn.execute('''CREATE TABLE IF NOT EXISTS records
+                        (label INTEGER PRIMARY KEY,
+                         doc_id TEXT UNIQUE NOT NULL,
+                         document TEXT,
+                         metadata TEXT)''')
+        conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+        conn.execute('CREATE TABLE IF NOT EXISTS tombstones (label INTEGER PRIMARY KEY, doc_id TEXT)')
+        conn.commit()
+
+    def _get_meta(self, key, cast=str):
+        row = self._db().execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return cast(row['value']) if row else None
+
+    def _set_meta(self, conn, key, value):
+        conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, str(value)))
+
+    @contextmanager
+    def _writing(self):
+        """Exclusive write access across threads and processes, caught up with committed state"""
+        with self._lock, _file_lock(self.lock_path):
+            self._sync()
+            yield
+
+    def _sync(self):
+        """Pick up rows, tombstones and compactions committed by other processes; caller holds self._lock"""
+        size, generation, tombstones = self._db().execute(
+            '''SELECT (SELECT value FROM meta WHERE key = 'size'),
+                      (SELECT value FROM meta WHERE key = 'generation'),
+                      (SELECT COUNT(*) FROM tombstones)''').fetchone()
+        if int(generation or 0) != self.generation:
+            self._reopen(int(generation or 0))
+            return
+        if int(size or 0) > self._size:
+            previous = self._size
+            self.dim = self.dim or self._get_meta('dim', int)
+            self._map_vectors()
+            self._catch_up_index(previous)
+        if tombstones != len(self._tombstones):
+            labels = {row['label'] for row in self._db().execute('SELECT label FROM tombstones')}
+            if self._index is not None:
+                for label in labels - self._tombstones:
+                    _mark_deleted(self._index, label)
+            self._tombstones = labels
+
+    def _reopen(self, generation):
+        """Switch to a generation another process compacted into"""
+        self.generation = generation
+        self.vectors_path, self.graph_path = self._paths(generation)
+        self.dim = self.dim or self._get_meta('dim', int)
+        self._tombstones = {row['label'] for row in self._db().execute('SELECT label FROM tombstones')}
+        self._map_vectors()
+        self._index = None
+        self._unsaved = 0
+        # A load still running in the background notices the generation change itself
+        if self._index_ready.is_set():
+            self._load_graph()
+
+    def _paths(self, generation):
+        suffix = f'.g{generation}' if generation else ''
+        return (os.path.join(self.directory, f'{self.name}{suffix}.vectors'),
+                os.path.join(self.directory, f'{self.name}{suffix}.hnsw'))
+
+    # -- vectors ----------------------------------------------------------
+
+    def _map_vectors(self):
+        """(Re)map the vector file; only rows committed to the catalogue are visible"""
+        committed = self._get_meta('size', int) or 0
+        if not self.dim or committed == 0 or not os.path.exists(self.vectors_path):
+            self._vectors = np.zeros((0, self.dim or 0), dtype=np.float32)
+            self._size = 0
+            return
+        self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode='r', shape=(committed, self.dim))
+        self._size = committed
+
+    # -- graph ------------------------------------------------------------
+
+    def _new_index(self, max_elements):
+        index = hnswlib.Index(space='l2', dim=self.dim)
+        index.init_index(max_elements=max(max_elements, 1024), ef_construction=self.ef_construction, M=self.M)
+        index.set_ef(self.ef_search)
+        return index
+
+    def _load_graph(self):
+        try:
+            while not self._try_load_graph():
+                pass
+        finally:
+            self._index_ready.set()
+
+    def _try_load_graph(self):
+        """Load the graph of the current generation; False if a compaction switched generations meanwhile"""
+        with self._lock:
+            size, vectors, generation, graph_path = self._size, self._vectors, self.generation, self.graph_path
+        if not self.dim:
+            return True
+        index = None
+        if os.path.exists(graph_path):
+            index = hnswlib.Index(space='l2', dim=self.dim)
+            index.load_index(graph_path, max_elements=max(size * 2, 1024))
+            index.set_ef(self.ef_search)
+        else:
+            index = self._new_index(size * 2)
+        start = index.get_current_count()
+        if start < size:
+            # Replay rows appended after the graph was last saved
+            index.add_items(np.asarray(vectors[start:size]), np.arange(start, size))
+        with self._lock:
+            if self.generation != generation:
+                return False
+            # Catch up with anything added while we were loading
+            if self._size > size:
+                index.resize_index(max(index.get_max_elements(), self._size * 2))
+                index.add_items(np.asarray(self._vectors[size:self._size]), np.arange(size, self._size))
+            for label in self._tombstones:
+                _mark_deleted(index, label)
+            self._index = index
+            self._unsaved += self._size - start
+        return True
+
+    def _catch_up_index(self, previous):
+        """Add rows previous..size to the graph; caller holds self._lock"""
+        if self._size <= previous:
+            return
+        if self._index is None:
+            if self._index_ready.is_set():
+                # The collection was empty when opened, so there was no graph to load
+                self._index = self._new_index(self._size * 2)
+                self._index.add_items(np.asarray(self._vectors), np.arange(self._size))
+                for label in self._tombstones:
+                    _mark_deleted(self._index, label)
+                self._unsaved += self._size
+            return
+        if self._index.get_max_elements() < self._size:
+            # resize_index reallocates; searches still running keep the original
+            index = copy.copy(self._index)
+            index.resize_index(self._size * 2)
+            self._index = index
+        self._index.add_items(np.asarray(self._vectors[previous:self._size]), np.arange(previous, self._size))
+        self._unsaved += self._size - previous
+
+    def wait_until_ready(self, timeout=None):
+        return self._index_ready.wait(timeout)
+
+    def set_ef_search(self, ef_search):
+        with self._lock:
+            self.ef_search = ef_search
+            if self._index is not None:
+                self._index.set_ef(ef_search)
+
+    def save_graph(self):
+        """Write the graph atomically; cheap no-op when nothing changed"""
+        with self._lock:
+            self._sync()
+            if self._index is None or self._unsaved == 0:
+                return
+            tmp_path = f'{self.graph_path}.{os.getpid()}.tmp'
+            self._index.save_index(tmp_path)
+            os.replace(tmp_path, self.graph_path)
+            self._unsaved = 0
+            self._last_save = time.monotonic()
+
+    # -- VectorStore ------------------------------------------------------
+
+    def add(self, ids, embeddings, documents, metadatas):
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim != 2 or len(vectors) != len(ids):
+            raise ValueError("embeddings must be a list of vectors matching ids")
+
+        with self._writing():
+            conn = self._db()
+            if not self.dim:
+                self.dim = vectors.shape[1]
+                self._set_meta(conn, 'dim', self.dim)
+            if vectors.shape[1] != self.dim:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match collection dimension {self.dim}")
+
+            # The committed size, just re-read under the file lock
+            start = self._size
+            labels = np.arange(start, start + len(ids))
+            with open(self.vectors_path, 'r+b' if os.path.exists(self.vectors_path) else 'wb') as file:
+                # Rows past the committed size are leftovers from an interrupted add
+                file.seek(start * self.dim * 4)
+                file.write(vectors.tobytes())
+                file.truncate()
+            conn.executemany('INSERT INTO records (label, doc_id, document, metadata) VALUES (?, ?, ?, ?)',
+                             [(int(label), doc_id, document, json.dumps(metadata or {}))
+                              for label, doc_id, document, metadata in zip(labels, ids, documents, metadatas)])
+            self._set_meta(conn, 'size', start + len(ids))
+            conn.commit()
+            self._map_vectors()
+            self._catch_up_index(start)
+
+    def get(self, ids=None, where=None, limit=None, include_embeddings=False):
+        sql = 'SELECT label, doc_id, document, metadata FROM records'
+        clauses, params = [], []
+        if ids is not None:
+            if not ids:
+                return []
+            clauses.append(f"doc_id IN ({','.join('?' * len(ids))})")
+            params.extend(ids)
+        if where:
+            where_sql, where_params = _where_sql(where)
+            clauses.append(where_sql)
+            params.extend(where_params)
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        sql += ' ORDER BY label'
+        if limit:
+            sql += ' LIMIT ?'
+            params.append(int(limit))
+        rows = self._db().execute(sql, params).fetchall()
+        return [self._record(row, include_embeddings) for row in rows]
+
+    def query(self, embedding, k, where=None):
+        if k <= 0:
+            return []
+        query = np.asarray(embedding, dtype=np.float32)
+        while True:
+            results = self._query(query, k, where)
+            if results is not None:
+                return results[:k]
+            # A compaction relabelled the catalogue mid-query; search the new generation
+
+    def _query(self, query, k, where):
+        """Results from one generation, or None if the catalogue moved on to another meanwhile"""
+        with self._lock:
+            self._sync()
+            size, vectors, index = self._size, self._vectors, self._index
+            dead, generation = len(self._tombstones), self.generation
+        if size - dead <= 0:
+            return []
+
+        allowed = None
+        if where:
+            where_sql, params = _where_sql(where)
+            rows = self._read_at(generation, f'SELECT label FROM records WHERE {where_sql}', params)
+            if rows is None:
+                return None
+            allowed = np.array([row[0] for row in rows], dtype=np.int64)
+            if allowed.size == 0:
+                return []
+
+        labels = None
+        if index is not None and index.get_current_count() and (allowed is None or allowed.size > k * 8):
+            try:
+                labels, distances = self._ann_search(index, query, k, allowed)
+            except RuntimeError:
+                # hnswlib could not collect enough unmasked neighbours; answer exactly instead
+                labels = None
+            if labels is not None and len(labels) < min(k, size - dead if allowed is None else allowed.size):
+                labels = None
+        if labels is None:
+            # Tombstoned rows are still in the vector file; over-fetch so they can be dropped
+            labels, distances = _exact_search(vectors, query, k + (dead if allowed is None else 0), allowed)
+        return self._fetch(labels, distances, generation)
+
+    def _ann_search(self, index, query, k, allowed):
+        """Search a graph taken under the lock, without holding it; a compaction meanwhile is caught by _fetch"""
+        if allowed is None:
+            labels, distances = index.knn_query(query, k=k)
+        else:
+            # The graph walk only admits allowed labels, so k matches come back whenever k exist
+            accept = set(allowed.tolist()).__contains__
+            labels, distances = index.knn_query(query, k=min(k, len(allowed)), filter=accept)
+        return labels[0].astype(np.int64), distances[0]
+
+    def _read_at(self, generation, sql, params=()):
+        """Rows of sql, or None if the catalogue is no longer at generation (labels were renumbered)"""
+        conn = self._db()
+        # One read transaction, so a compaction cannot commit between the check and the read
+        conn.execute('BEGIN')
+        try:
+            current = conn.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()
+            if int(current[0] if current else 0) != generation:
+                return None
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.commit()
+
+    def _fetch(self, labels, distances, generation):
+        if len(labels) == 0:
+            return []
+        rows = self._read_at(
+            generation,
+            f"SELECT label, doc_id, document, metadata FROM records WHERE label IN ({','.join('?' * len(labels))})",
+            [int(label) for label in labels])
+        if rows is None:
+            return None
+        by_label = {row['label']: row for row in rows}
+        return [(self._record(by_label[int(label)]), float(distance))
+                for label, distance in zip(labels, distances) if int(label) in by_label]
+
+    def _record(self, row, include_embedding=False):
+        record = {
+            'id': row['doc_id'],
+            'document': row['document'],
+            'metadata': json.loads(row['metadata'] or '{}')
+        }
+        if include_embedding:
+            record['embedding'] = self._vectors[row['label']].tolist()
+        return record
+
+    def delete(self, ids):
+        """Tombstone documents: drop their catalogue rows and mask their labels in the graph"""
+        if not ids:
+            return 0
+        with self._writing():
+            conn = self._db()
+            rows = conn.execute(f"SELECT label, doc_id FROM records WHERE doc_id IN ({','.join('?' * len(ids))})",
+                                list(ids)).fetchall()
+            if not rows:
+                return 0
+            labels = [row['label'] for row in rows]
+            conn.executemany('INSERT OR REPLACE INTO tombstones (label, doc_id) VALUES (?, ?)',
+                             [(row['label'], row['doc_id']) for row in rows])
+            conn.execute(f"DELETE FROM records WHERE label IN ({','.join('?' * len(labels))})", labels)
+            conn.commit()
+            self._tombstones.update(labels)
+            if self._index is not None:
+                for label in labels:
+                    _mark_deleted(self._index, label)
+                self._unsaved += len(labels)
+        return len(labels)
+
+    def count(self):
+        with self._lock:
+            self._sync()
+            return self._size - len(self._tombstones)
+
+    def tombstone_count(self):
+        with self._lock:
+            self._sync()
+            return len(self._tombstones)
+
+    def compact(self):
+        """Rewrite vectors and graph without tombstoned rows, relabelling live rows 0..n-1.
+
+        The bulk of the work (copying live vectors, building the graph) runs
+        without the lock against the state at the start; documents added or
+        deleted meanwhile are applied before the new generation is published.
+        """
+        self._index_ready.wait()
+        # One compaction per collection at a time, across processes; others skip
+        with _file_lock(self.compact_lock_path, blocking=False) as acquired:
+            if not acquired:
+                return False
+            return self._compact()
+
+    def _compact(self):
+        with self._lock:
+            self._sync()
+            if not self._tombstones:
+                return False
+            size, vectors, dead = self._size, self._vectors, set(self._tombstones)
+
+        live = np.setdiff1d(np.arange(size), np.fromiter(dead, dtype=np.int64, count=len(dead)))
+        generation = self.generation + 1
+        vectors_path, graph_path = self._paths(generation)
+        with open(vectors_path, 'wb') as file:
+            for start in range(0, len(live), SCAN_BLOCK):
+                file.write(np.asarray(vectors[live[start:start + SCAN_BLOCK]], dtype=np.float32).tobytes())
+        index = self._new_index(len(live) * 2)
+        for start in range(0, len(live), SCAN_BLOCK):
+            chunk = live[start:start + SCAN_BLOCK]
+            index.add_items(np.asarray(vectors[chunk]), np.arange(start, start + len(chunk)))
+
+        with self._writing():
+            # Rows appended while rebuilding keep their order after the live ones
+            old_labels = np.concatenate([live, np.arange(size, self._size)]).astype(np.int64)
+            new_labels = np.arange(len(old_labels))
+            if self._size > size:
+                appended = np.asarray(self._vectors[size:self._size])
+                with open(vectors_path, 'ab') as file:
+                    file.write(appended.astype(np.float32).tobytes())
+                index.resize_index(max(index.get_max_elements(), len(old_labels) * 2))
+                index.add_items(appended, new_labels[len(live):])
+            relabel = dict(zip(old_labels.tolist(), new_labels.tolist()))
+            # Deleted while rebuilding: still present in the new generation, so they stay tombstoned
+            carried = {relabel[label] for label in self._tombstones - dead}
+            for label in carried:
+                _mark_deleted(index, label)
+            index.save_index(graph_path)
+
+            conn = self._db()
+            conn.execute('CREATE TEMP TABLE IF NOT EXISTS relabel (old INTEGER PRIMARY KEY, new INTEGER)')
+            conn.execute('DELETE FROM temp.relabel')
+            conn.executemany('INSERT INTO temp.relabel (old, new) VALUES (?, ?)', relabel.items())
+            # Two steps through negative labels so no intermediate state collides on the primary key
+            conn.execute('UPDATE records SET label = -1 - (SELECT new FROM temp.relabel WHERE old = records.label)')
+            conn.execute('UPDATE records SET label = -1 - label')
+            rows = conn.execute('SELECT label, doc_id FROM tombstones').fetchall()
+            conn.execute('DELETE FROM tombstones')
+            conn.executemany('INSERT INTO tombstones (label, doc_id) VALUES (?, ?)',
+                             [(relabel[row['label']], row['doc_id']) for row in rows if row['label'] not in dead])
+            self._set_meta(conn, 'size', len(old_labels))
+            self._set_meta(conn, 'generation', generation)
+            conn.commit()
+
+            previous = (self.vectors_path, self.graph_path)
+            self.generation = generation
+            self.vectors_path, self.graph_path = vectors_path, graph_path
+            self._tombstones = carried
+            self._map_vectors()
+            self._index = index
+            self._unsaved = 0
+            self._last_save = time.monotonic()
+        for path in previous:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        return True
+
+    def persist(self):
+        if self._unsaved >= self.graph_save_every or (
+                self._unsaved and time.monotonic() - self._last_save >= self.graph_save_interval):
+            self.save_graph()
+
+
+class ShardedVectorStore(VectorStore):
+    """Collection split into shards by one metadata field, searched with a parallel fan-out.
+
+    mode 'value' keeps one shard per distinct value (e.g. one per college or
+    tenant); mode 'hash' spreads values over shard_count shards by CRC32.
+    Queries whose filter pins the shard key only touch the matching shard;
+    everything else fans out to all shards in a thread pool and the per-shard
+    top-k lists are merged with a heap. An optional legacy store (the
+    unsharded collection from before sharding was enabled) is always searched.
+    """
+
+    def __init__(self, open_shard, directory, shard_key, mode='value', shard_count=16,
+                 legacy=None, max_workers=8):
+        if mode not in ('value', 'hash'):
+            raise ValueError(f"Unknown shard mode: {mode}")
+        os.makedirs(directory, exist_ok=True)
+        self.open_shard = open_shard
+        self.shard_key = shard_key
+        self.mode = mode
+        self.shard_count = shard_count
+        self.legacy = legacy
+        self.registry_path = os.path.join(directory, 'shards.json')
+        self.registry_lock_path = os.path.join(directory, 'shards.lock')
+        self._shards = {}
+        self._registry_mtime = None
+        self._lock = threading.RLock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='shard-search')
+        self._refresh_registry()
+
+    def shard_for(self, value):
+        value = '' if value is None else str(value)
+        if self.mode == 'hash':
+            return f'h{zlib.crc32(value.encode("utf-8")) % self.shard_count:03d}'
+        slug = re.sub(r'[^a-z0-9]+', '-', value.lower()).strip('-')[:48]
+        return slug or 'default'
+
+    def _refresh_registry(self):
+        """Pick up shards created by other processes"""
+        try:
+            mtime = os.stat(self.registry_path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._registry_mtime:
+            return
+        with open(self.registry_path) as file:
+            names = json.load(file)
+        with self._lock:
+            for name in names:
+                if name not in self._shards:
+                    self._shards[name] = self.open_shard(name)
+            self._registry_mtime = mtime
+
+    def _shard(self, name, create=False):
+        with self._lock:
+            shard = self._shards.get(name)
+            if shard is None and create:
+                shard = self._shards[name] = self.open_shard(name)
+                # Other processes register shards too; merge under the lock so none is lost
+                with _file_lock(self.registry_lock_path):
+                    tmp_path = f'{self.registry_path}.{os.getpid()}.tmp'
+                    with open(tmp_path, 'w') as file:
+                        json.dump(sorted(set(self._shards) | set(self._read_registry())), file)
+                    os.replace(tmp_path, self.registry_path)
+            return shard
+
+    def _read_registry(self):
+        try:
+            with open(self.registry_path) as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return []
+
+    def _targets(self, where):
+        """Stores a query with this filter has to visit"""
+        self._refresh_registry()
+        values = _pinned_values(where, self.shard_key) if where else None
+        with self._lock:
+            if values is None:
+                shards = list(self._shards.values())
+            else:
+                shards = [self._shards[name] for name in {self.shard_for(v) for v in values} if name in self._shards]
+        if self.legacy is not None:
+            shards.append(self.legacy)
+        return shards
+
+    def _fan_out(self, stores, call):
+        if len(stores) <= 1:
+            return [call(store) for store in stores]
+        return list(self._pool.map(call, stores))
+
+    def add(self, ids, embeddings, documents, metadatas):
+        groups = {}
+        for i, metadata in enumerate(metadatas):
+            groups.setdefault(self.shard_for((metadata or {}).get(self.shard_key)), []).append(i)
+        for name, rows in groups.items():
+            self._shard(name, create=True).add(
+                [ids[i] for i in rows], [embeddings[i] for i in rows],
+                [documents[i] for i in rows], [metadatas[i] for i in rows])
+
+    def get(self, ids=None, where=None, limit=None, include_embeddings=False):
+        parts = self._fan_out(self._targets(where),
+                              lambda store: store.get(ids=ids, where=where, limit=limit,
+                                                      include_embeddings=include_embeddings))
+        records = [record for part in parts for record in part]
+        return records[:limit] if limit else records
+
+    def query(self, embedding, k, where=None):
+        parts = self._fan_out(self._targets(where), lambda store: store.query(embedding, k, where))
+        return heapq.nsmallest(k, (pair for part in parts for pair in part), key=lambda pair: pair[1])
+
+    def delete(self, ids):
+        return sum(self._fan_out(self._targets(None), lambda store: store.delete(ids)))
+
+    def count(self):
+        return sum(store.count() for store in self._targets(None))
+
+    def tombstone_count(self):
+        return sum(store.tombstone_count() for store in self._targets(None))
+
+    def parts(self):
+        return [part for store in self._targets(None) for part in store.parts()]
+
+    def persist(self):
+        for store in self._targets(None):
+            store.persist()
+
+
+class Compactor:
+    """Background job compacting stores whose tombstones exceed a share of their live documents"""
+
+    def __init__(self, stores, ratio=0.2, min_tombstones=100, interval=60.0):
+        self.stores = stores
+        self.ratio = ratio
+        self.min_tombstones = min_tombstones
+        self.interval = interval
+        self._stop = threading.Event()
+
+    def start(self):
+        threading.Thread(target=self._run, name='vector-compactor', daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.compact_if_needed()
+            except Exception as e:
+                print(f"Error compacting vector store: {e}")
+
+    def needs_compaction(self, store):
+        tombstones = store.tombstone_count()
+        return tombstones >= self.min_tombstones and tombstones >= self.ratio * max(store.count(), 1)
+
+    def compact_if_needed(self):
+        """Compact every over-threshold part; returns how many were rebuilt"""
+        compacted = 0
+        for store in self.stores:
+            for part in store.parts():
+                if self.needs_compaction(part) and part.compact():
+                    compacted += 1
+        return compacted
+
+
+def cosine_similarity(distance):
+    """Cosine similarity of normalised embeddings from their squared L2 distance (2 - 2 * cosine)"""
+    return 1.0 - distance / 2.0
+
+
+@contextmanager
+def _file_lock(path, blocking=True):
+    """Exclusive advisory lock on path across processes; yields False if not blocking and held elsewhere"""
+    with open(path, 'a+b') as file:
+        try:
+            if fcntl is not None:
+                fcntl.flock(file, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            else:
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+        except OSError:
+            if blocking:
+                raise
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            if fcntl is not None:
+                fcntl.flock(file, fcntl.LOCK_UN)
+            else:
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _mark_deleted(index, label):
+    try:
+        index.mark_deleted(int(label))
+    except RuntimeError:
+        # Already masked, or not in this graph yet (it will be masked when replayed)
+        pass
+
+
+def _pinned_values(where, key):
+    """Values the filter restricts `key` to, or None when any value may match"""
+    if '$and' in where:
+        for clause in where['$and']:
+            values = _pinned_values(clause, key)
+            if values is not None:
+                return values
+        return None
+    if '$or' in where:
+        values = set()
+        for clause in where['$or']:
+            pinned = _pinned_values(clause, key)
+            if pinned is None:
+                return None
+            values |= pinned
+        return values
+    if key not in where:
+        return None
+    value = where[key]
+    if isinstance(value, dict):
+        return {value['$eq']} if '$eq' in value else None
+    return {value}
+
+
+def _exact_search(vectors, query, k, allowed=None):
+    """Brute-force squared L2 top-k over (a subset of) the vectors, scanned in blocks"""
+    best_labels = np.zeros(0, dtype=np.int64)
+    best_distances = np.zeros(0, dtype=np.float32)
+    qq = float(query @ query)
+    total = len(vectors) if allowed is None else len(allowed)
+    for start in range(0, total, SCAN_BLOCK):
+        if allowed is None:
+            labels = np.arange(start, min(start + SCAN_BLOCK, total))
+            block = np.asarray(vectors[start:start + SCAN_BLOCK])
+        else:
+            labels = allowed[start:start + SCAN_BLOCK]
+            block = np.asarray(vectors[labels])
+        distances = np.einsum('ij,ij->i', block, block) - 2.0 * (block @ query) + qq
+        labels = np.concatenate([best_labels, labels])
+        distances = np.concatenate([best_distances, distances])
+        if len(distances) > k:
+            top = np.argpartition(distances, k - 1)[:k]
+            labels, distances = labels[top], distances[top]
+        best_labels, best_distances = labels, distances
+    order = np.argsort(best_distances, kind='stable')
+    return best_labels[order], np.maximum(best_distances[order], 0.0)
+
+
+def _where_sql(where):
+    """Translate a Chroma-style equality filter ($and / $or supported) to SQL over the metadata JSON"""
+    if '$and' in where or '$or' in where:
+        op = '$and' if '$and' in where else '$or'
+        parts = [_where_sql(clause) for clause in where[op]]
+        joiner = ' AND ' if op == '$and' else ' OR '
+        return '(' + joiner.join(sql for sql, _ in parts) + ')', [p for _, params in parts for p in params]
+    clauses, params = [], []
+    for key, value in where.items():
+        if isinstance(value, dict):
+            if set(value) != {'$eq'}:
+                raise ValueError(f"Unsupported filter operator for {key}: {list(value)}")
+            value = value['$eq']
+        clauses.append('json_extract(metadata, ?) = ?')
+        params.extend([f'$.{key}', value])
+    return '(' + ' AND '.join(clauses) + ')', params
+
+
+def create_vector_store(backend, name, directory, embedding_function, **hnsw_params):
+    """Open the collection `name` with the configured backend ('chroma' or 'hnsw')"""
+    if backend == 'hnsw':
+        return HNSWVectorStore(directory, name, **hnsw_params)
+    return ChromaVectorStore(name, embedding_function, directory)
+
+
+if __name__ == '__main__':
+    # Recall vs latency benchmark on synthetic clustered embeddings:
+    #   python vector_store.py [n] [dim]
+    import shutil
+    import sys
+    import tempfile
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    dim = int(sys.argv[2]) if len(sys.argv) > 2 else 384
+    k = 10
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(256, dim)).astype(np.float32)
+    data = centers[rng.integers(0, 256, n)] + 0.6 * rng.normal(size=(n, dim)).astype(np.float32)
+    data /= np.linalg.norm(data, axis=1, keepdims=True)
+    queries = data[rng.choice(n, 200, replace=False)] + 0.05 * rng.normal(size=(200, dim)).astype(np.float32)
+
+    directory = tempfile.mkdtemp(prefix='hnsw-bench-')
+    try:
+        store = HNSWVectorStore(directory, 'bench', load_graph=False)
+        started = time.perf_counter()
+        for offset in range(0, n, 5000):
+            chunk = data[offset:offset + 5000]
+            ids = [f'doc-{i}' for i in range(offset, offset + len(chunk))]
+            store.add(ids, chunk, [''] * len(chunk), [{}] * len(chunk))
+        store._load_graph()
+        store.save_graph()
+        print(f"build: {n} x {dim} in {time.perf_counter() - started:.1f}s")
+
+        started = time.perf_counter()
+        reopened = HNSWVectorStore(directory, 'bench')
+        print(f"open (mmap, graph loading in background): {(time.perf_counter() - started) * 1000:.1f} ms")
+        reopened.wait_until_ready()
+        print(f"graph ready after: {(time.perf_counter() - started) * 1000:.1f} ms")
+
+        truth = [set(_exact_search(data, q, k)[0].tolist()) for q in queries]
+        started = time.perf_counter()
+        for q in queries:
+            _exact_search(reopened._vectors, q, k)
+        exact_ms = (time.perf_counter() - started) * 1000 / len(queries)
+        print(f"exact scan: {exact_ms:.2f} ms/query, recall 1.000")
+
+        for ef in (10, 20, 40, 80, 160, 320):
+            reopened.set_ef_search(max(ef, k))
+            hits = 0
+            started = time.perf_counter()
+            for q, expected in zip(queries, truth):
+                labels, _ = reopened._ann_search(reopened._index, q, k, None)
+                hits += len(expected.intersection(labels.tolist()))
+            elapsed = (time.perf_counter() - started) * 1000 / len(queries)
+            print(f"ef_search={ef:>4}: {elapsed:.3f} ms/query, recall@{k} {hits / (k * len(queries)):.3f}")
+    finally:
+        shutil.rmtree(directory)